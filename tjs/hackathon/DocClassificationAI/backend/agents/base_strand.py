@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import time
 import logging
+from utils.metrics import STRAND_DURATION, STRAND_RUNS
 
 class Strand(ABC):
     """
@@ -8,6 +10,20 @@ class Strand(ABC):
     Each strand processes input data and returns modified data.
     """
     
+    # Whether the strand can run on a leading prefix of 'extracted_text' while
+    # OCR of the remaining pages is still pending
+    accepts_partial_text = False
+    
+    # Documents this strand works on at once when the pipeline runs as a stream
+    stage_workers = 2
+    
+    # Pipeline data fields the strand reads and writes (its own '<name>_status' and
+    # '<name>_error' are implied). The pipeline runs strands whose fields do not
+    # conflict concurrently; None means undeclared, so the strand runs after every
+    # strand listed before it and before every strand listed after it.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
+    
     def __init__(self, name: str):
         self.name = name
         self.logger = logging.getLogger(f"strand.{name}")
@@ -48,6 +64,7 @@ class Strand(ABC):
         Returns:
             Processed data for next strand
         """
+        start_time = time.perf_counter()
         try:
             if not self.validate_input(input_data):
                 raise ValueError(f"Invalid input for strand {self.name}")
@@ -56,11 +73,13 @@ class Strand(ABC):
             result = await self.run(input_data)
             self.logger.info(f"Completed {self.name} strand")
             
-            return result
-            
         except Exception as e:
             self.logger.error(f"Error in {self.name} strand: {str(e)}")
             # Add error information to the data
             input_data[f"{self.name}_error"] = str(e)
             input_data[f"{self.name}_status"] = "failed"
-            return input_data 
\ No newline at end of file
+            result = input_data
+            
+        STRAND_DURATION.observe(time.perf_counter() - start_time, strand=self.name)
+        STRAND_RUNS.inc(strand=self.name, status="failed" if result.get(f"{self.name}_status") == "failed" else "success")
+        return result 
\ No newline at end of file
@@ -1,7 +1,14 @@
 import os
 import re
+import time
+import asyncio
+import hashlib
 from typing import Dict, Any, Optional
 from .base_strand import Strand
+from utils.circuit_breaker import CircuitBreaker
+from utils.classification_cache import ClassificationCache
+from utils.metrics import LLM_DURATION, LLM_FALLBACKS, LLM_REQUESTS
+from utils.tracing import span
 import groq
 import openai
 import google.generativeai as genai
@@ -14,9 +21,26 @@ class ClassificationStrand(Strand):
     Classification Strand: Uses LLM to determine document type and confidence score.
     """
     
-    def __init__(self, llm_provider: str = "groq"):
+    # Only reads the first 4000 characters of extracted_text
+    accepts_partial_text = True
+    
+    # Mostly waiting on the LLM provider, so many documents can be in flight
+    stage_workers = 8
+    
+    reads = ("extracted_text",)
+    writes = ("document_type", "confidence", "classification_reasoning", "classification_cache_hit")
+    
+    # Model used for each provider
+    MODELS = {
+        "groq": "llama3-8b-8192",
+        "openai": "gpt-3.5-turbo",
+        "gemini": "gemini-1.5-flash"
+    }
+    
+    def __init__(self, llm_provider: str = "groq", use_cache: bool = True):
         super().__init__("classification")
         self.llm_provider = llm_provider
+        self.model = self.MODELS.get(llm_provider)
         
         # Initialize LLM client
         if llm_provider == "groq":
@@ -34,9 +58,29 @@ class ClassificationStrand(Strand):
             if not api_key:
                 raise ValueError("GOOGLE_API_KEY environment variable is required")
             genai.configure(api_key=api_key)
-            self.client = genai.GenerativeModel('gemini-1.5-flash')
+            self.client = genai.GenerativeModel(self.model)
         else:
             raise ValueError(f"Unsupported LLM provider: {llm_provider}")
+            
+        # Upper bound on one LLM request; slower requests fall back to keywords (0 disables)
+        self.llm_timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+        # Stops calling a degraded provider so documents fall back straight away
+        self.circuit_breaker = CircuitBreaker(
+            f"llm_{llm_provider}",
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "10")),
+            reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+        )
+        
+        # Cache of LLM results; a change to the prompt or model invalidates it
+        self.prompt_version = hashlib.sha256(self._build_prompt("").encode()).hexdigest()[:16]
+        self.classification_cache = None
+        if use_cache and os.getenv("CLASSIFICATION_CACHE_PATH", "data/classification_cache.db"):
+            self.classification_cache = ClassificationCache(
+                db_path=os.getenv("CLASSIFICATION_CACHE_PATH", "data/classification_cache.db"),
+                ttl_hours=float(os.getenv("CLASSIFICATION_CACHE_TTL_HOURS", "720")),
+                max_entries=int(os.getenv("CLASSIFICATION_CACHE_MAX_ENTRIES", "50000"))
+            )
     
     def validate_input(self, input_data: Dict[str, Any]) -> bool:
         """Validate that extracted_text exists in input_data."""
@@ -90,7 +134,92 @@ class ClassificationStrand(Strand):
         Returns:
             Dictionary with document_type and confidence
         """
-        prompt = f"""
+        cache_key = None
+        if self.classification_cache:
+            cache_key = ClassificationCache.make_key(text, f"{self.llm_provider}/{self.model}", self.prompt_version)
+            try:
+                cached = await asyncio.to_thread(self.classification_cache.get, cache_key)
+            except Exception as e:
+                self.logger.warning(f"Classification cache lookup failed: {str(e)}")
+                cached = None
+            if cached:
+                cached["classification_reasoning"] = f"[cached] {cached['classification_reasoning']}"
+                cached["classification_cache_hit"] = True
+                return cached
+                
+        if not self.circuit_breaker.allow():
+            # Provider is failing; don't make this document wait for it too
+            LLM_REQUESTS.inc(provider=self.llm_provider, status="short_circuited")
+            LLM_FALLBACKS.inc(provider=self.llm_provider)
+            return self._fallback_classification(text)
+            
+        prompt = self._build_prompt(text)
+        try:
+            start_time = time.perf_counter()
+            try:
+                with span("llm_request", provider=self.llm_provider, prompt_chars=len(prompt)):
+                    result_text = await asyncio.wait_for(self._call_llm(prompt), timeout=self.llm_timeout or None)
+            except asyncio.TimeoutError:
+                self.circuit_breaker.record_failure("timeout")
+                raise TimeoutError(f"{self.llm_provider} did not respond within {self.llm_timeout}s") from None
+            except Exception as e:
+                self.circuit_breaker.record_failure(str(e))
+                raise
+            except BaseException:
+                self.circuit_breaker.record_abandoned()
+                raise
+            finally:
+                duration = time.perf_counter() - start_time
+                LLM_DURATION.observe(duration, provider=self.llm_provider)
+            self.circuit_breaker.record_success(duration)
+            
+            # Parse JSON response
+            import json
+            import re
+            
+            # Try to extract JSON from the response (in case LLM adds extra text)
+            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
+            if json_match:
+                json_str = json_match.group(0)
+                result = json.loads(json_str)
+            else:
+                result = json.loads(result_text)
+                
+            LLM_REQUESTS.inc(provider=self.llm_provider, status="success")
+            classification = {
+                "document_type": result.get("category", "unknown"),
+                "confidence": float(result.get("confidence", 0.0)) / 100.0,  # Convert 0-100 to 0-1
+                "classification_reasoning": result.get("reasoning", "")
+            }
+            
+        except Exception as e:
+            self.logger.error(f"LLM classification failed: {str(e)}")
+            LLM_REQUESTS.inc(provider=self.llm_provider,
+                             status="timeout" if isinstance(e, TimeoutError) else "failed")
+            LLM_FALLBACKS.inc(provider=self.llm_provider)
+            # Fallback classification based on keywords
+            return self._fallback_classification(text)
+            
+        # Only LLM answers are cached; keyword fallbacks are retried next time
+        if cache_key:
+            try:
+                await asyncio.to_thread(self.classification_cache.put, cache_key, classification)
+            except Exception as e:
+                self.logger.warning(f"Could not cache classification: {str(e)}")
+        classification["classification_cache_hit"] = False
+        return classification
+    
+    def _build_prompt(self, text: str) -> str:
+        """
+        Build the classification prompt for a document.
+        
+        Args:
+            text: Extracted text from document (already truncated)
+            
+        Returns:
+            Prompt to send to the LLM
+        """
+        return f"""
         You are an expert VA document classification system. Classify documents with ULTRA-HIGH precision to minimize false positives.
 
         ## DOCUMENT CATEGORIES WITH PRECISE VA-SPECIFIC DEFINITIONS
@@ -275,56 +404,53 @@ class ClassificationStrand(Strand):
         Document text to classify:
         {text}
         """
+    
+    async def _call_llm(self, prompt: str) -> str:
+        """
+        Send the classification prompt to the configured provider.
         
-        try:
-            if self.llm_provider == "groq":
-                response = self.client.chat.completions.create(
-                    model="llama3-8b-8192",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=500
-                )
-                result_text = response.choices[0].message.content
-            elif self.llm_provider == "openai":
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=500
-                )
-                result_text = response.choices[0].message.content
-            elif self.llm_provider == "gemini":
-                response = self.client.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.1,
-                        max_output_tokens=500,
-                    )
-                )
-                result_text = response.text
-            
-            # Parse JSON response
-            import json
-            import re
-            
-            # Try to extract JSON from the response (in case LLM adds extra text)
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-            else:
-                result = json.loads(result_text)
-            
-            return {
-                "document_type": result.get("category", "unknown"),
-                "confidence": float(result.get("confidence", 0.0)) / 100.0,  # Convert 0-100 to 0-1
-                "classification_reasoning": result.get("reasoning", "")
-            }
+        Args:
+            prompt: Classification prompt
             
-        except Exception as e:
-            self.logger.error(f"LLM classification failed: {str(e)}")
-            # Fallback classification based on keywords
-            return self._fallback_classification(text)
+        Returns:
+            Raw response text
+        """
+        # The provider SDK calls block; run them in a thread so concurrently
+        # processed documents are not serialized on the event loop. The SDK
+        # timeout lets the thread give up too once the request is abandoned.
+        sdk_timeout = {"timeout": self.llm_timeout} if self.llm_timeout else {}
+        if self.llm_provider == "groq":
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=500,
+                **sdk_timeout
+            )
+            return response.choices[0].message.content
+        elif self.llm_provider == "openai":
+            response = await asyncio.to_thread(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                max_tokens=500,
+                **sdk_timeout
+            )
+            return response.choices[0].message.content
+        elif self.llm_provider == "gemini":
+            response = await asyncio.to_thread(
+                self.client.generate_content,
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.1,
+                    max_output_tokens=500,
+                ),
+                # The SDK's own retries would outlive the timeout; the circuit breaker handles failures
+                request_options={**sdk_timeout, "retry": None} if sdk_timeout else {}
+            )
+            return response.text
     
     def _fallback_classification(self, text: str) -> Dict[str, Any]:
         """
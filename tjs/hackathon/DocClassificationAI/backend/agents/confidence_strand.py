@@ -6,6 +6,13 @@ class ConfidenceStrand(Strand):
     Confidence Strand: Decides if document goes to human review or auto-processing.
     """
     
+    # Only reads the classification results
+    accepts_partial_text = True
+    
+    reads = ("document_type", "confidence")
+    writes = ("processing_route", "confidence_decision", "requires_review", "is_rejected",
+              "is_auto_processed", "is_discarded")
+    
     def __init__(self, high_confidence_threshold: float = 0.8, low_confidence_threshold: float = 0.6):
         super().__init__("confidence")
         self.high_confidence_threshold = high_confidence_threshold
@@ -4,15 +4,134 @@ import os
 from typing import Dict, Any, List
 from .base_strand import Strand
 from utils.ocr_helpers import OCRHelpers
+from utils.tracing import span
+
+class GeneralDataExtractionStrand(Strand):
+    """
+    General Data Extraction Strand: Extracts data found in any VA document
+    (emails, phone numbers, names, SSN, disability info, form numbers).
+    
+    It only needs the text, so it runs alongside classification.
+    """
+    
+    reads = ("extracted_text",)
+    writes = ("general_data",)
+    
+    def __init__(self):
+        super().__init__("general_extraction")
+        self.ocr_helpers = OCRHelpers()
+    
+    def validate_input(self, input_data: Dict[str, Any]) -> bool:
+        """Validate that extracted_text exists in input_data."""
+        return "extracted_text" in input_data and input_data["extracted_text"].strip()
+    
+    async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract general data from document text.
+        
+        Args:
+            input_data: Dictionary containing 'extracted_text'
+            
+        Returns:
+            Dictionary with general data
+        """
+        with span("regex_extraction", kind="general"):
+            input_data["general_data"] = self.extract(input_data["extracted_text"])
+        input_data["general_extraction_status"] = "success"
+        return input_data
+    
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Extract general data like emails, phones, names."""
+        data = {}
+        
+        # Extract emails
+        emails = self.ocr_helpers.extract_emails(text)
+        if emails:
+            data["emails"] = emails
+            data["primary_email"] = emails[0]
+            
+        # Extract phone numbers
+        phones = self.ocr_helpers.extract_phone_numbers(text)
+        if phones:
+            data["phone_numbers"] = phones
+            data["primary_phone"] = phones[0]
+            
+        # Extract names using enhanced patterns
+        names = self.ocr_helpers.extract_names(text)
+        
+        # Additional name extraction patterns specific to VA documents by type
+        additional_name_patterns = [
+            # RDL (Rating Decision Letter) specific patterns
+            r'Dear\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'This\s+letter\s+is\s+to\s+inform\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'We\s+have\s+(?:granted|denied).*?([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            
+            # RCS (Rating Claim Statement) specific patterns
+            r'Claimant[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'Service\s+Member[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'Your\s+claim.*?([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            
+            # Medical Evidence specific patterns  
+            r'Patient[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'Patient\s+Name[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'Examination\s+of[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            
+            # Lay Statement specific patterns
+            r'I,\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+),\s+(?:am|was|served)',
+            r'My\s+name\s+is\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'Statement\s+(?:of|by)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            
+            # General patterns
+            r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s*,?\s*SSN',
+            r'File\s+of[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'RE[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
+            r'([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)\s*,?\s*DOB'
+        ]
+        
+        for pattern in additional_name_patterns:
+            matches = re.findall(pattern, text)
+            for match in matches:
+                clean_name = match.strip()
+                if len(clean_name.split()) >= 2 and clean_name not in names:
+                    names.append(clean_name)
+                    
+        if names:
+            data["names"] = names
+            data["primary_name"] = names[0]
+            
+        # Extract SSN (general pattern)
+        ssn_pattern = r"(\d{3}-\d{2}-\d{4})"
+        ssn_matches = re.findall(ssn_pattern, text)
+        if ssn_matches:
+            data["ssn"] = ssn_matches[0]
+            
+        # Extract disability info
+        disability_info = self.ocr_helpers.extract_disability_info(text)
+        data["disability_info"] = disability_info
+        
+        # Extract VA forms
+        va_forms = self.ocr_helpers.extract_va_forms(text)
+        if va_forms:
+            data["va_forms"] = va_forms
+            data["primary_form"] = va_forms[0]
+            
+        return data
+
 
 class DataExtractionStrand(Strand):
     """
     Data Extraction Strand: Extracts structured data from VA documents.
+    
+    Combines the general data (from GeneralDataExtractionStrand when it ran)
+    with the fields of the specific form identified by classification.
     """
     
+    reads = ("extracted_text", "document_type", "general_data", "original_filename")
+    writes = ("extracted_data",)
+    
     def __init__(self):
         super().__init__("data_extraction")
-        self.ocr_helpers = OCRHelpers()
+        self.general_extractor = GeneralDataExtractionStrand()
         
         # VA Form patterns and field mappings
         self.form_patterns = {
@@ -168,11 +287,15 @@ class DataExtractionStrand(Strand):
         document_type = input_data.get("document_type", "unknown")
         
         try:
-            # Extract general data (emails, phones, etc.)
-            general_data = self._extract_general_data(extracted_text)
-            
+            # General data (emails, phones, etc.), unless already extracted alongside classification
+            general_data = input_data.get("general_data")
+            if general_data is None:
+                with span("regex_extraction", kind="general"):
+                    general_data = self.general_extractor.extract(extracted_text)
+                
             # Extract form-specific data
-            form_data = self._extract_form_data(extracted_text, document_type)
+            with span("regex_extraction", kind="form", document_type=document_type):
+                form_data = self._extract_form_data(extracted_text, document_type)
             
             # Combine all extracted data
             extracted_data = {
@@ -187,7 +310,8 @@ class DataExtractionStrand(Strand):
             input_data["data_extraction_status"] = "success"
             
             # Save to local storage
-            self._save_extracted_data(extracted_data, input_data.get("original_filename", "unknown"))
+            with span("json_write"):
+                self._save_extracted_data(extracted_data, input_data.get("original_filename", "unknown"))
             
             self.logger.info(f"Extracted {len(extracted_data)} data fields from {document_type}")
             
@@ -200,83 +324,6 @@ class DataExtractionStrand(Strand):
             input_data["data_extraction_error"] = str(e)
             return input_data
     
-    def _extract_general_data(self, text: str) -> Dict[str, Any]:
-        """Extract general data like emails, phones, names."""
-        data = {}
-        
-        # Extract emails
-        emails = self.ocr_helpers.extract_emails(text)
-        if emails:
-            data["emails"] = emails
-            data["primary_email"] = emails[0]
-        
-        # Extract phone numbers
-        phones = self.ocr_helpers.extract_phone_numbers(text)
-        if phones:
-            data["phone_numbers"] = phones
-            data["primary_phone"] = phones[0]
-        
-        # Extract names using enhanced patterns
-        names = self.ocr_helpers.extract_names(text)
-        
-        # Additional name extraction patterns specific to VA documents by type
-        additional_name_patterns = [
-            # RDL (Rating Decision Letter) specific patterns
-            r'Dear\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'This\s+letter\s+is\s+to\s+inform\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'We\s+have\s+(?:granted|denied).*?([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            
-            # RCS (Rating Claim Statement) specific patterns
-            r'Claimant[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'Service\s+Member[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'Your\s+claim.*?([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            
-            # Medical Evidence specific patterns  
-            r'Patient[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'Patient\s+Name[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'Examination\s+of[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            
-            # Lay Statement specific patterns
-            r'I,\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+),\s+(?:am|was|served)',
-            r'My\s+name\s+is\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'Statement\s+(?:of|by)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            
-            # General patterns
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)\s*,?\s*SSN',
-            r'File\s+of[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'RE[:\s]*([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)',
-            r'([A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s+[A-Z][a-z]+)\s*,?\s*DOB'
-        ]
-        
-        for pattern in additional_name_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                clean_name = match.strip()
-                if len(clean_name.split()) >= 2 and clean_name not in names:
-                    names.append(clean_name)
-        
-        if names:
-            data["names"] = names
-            data["primary_name"] = names[0]
-        
-        # Extract SSN (general pattern)
-        ssn_pattern = r"(\d{3}-\d{2}-\d{4})"
-        ssn_matches = re.findall(ssn_pattern, text)
-        if ssn_matches:
-            data["ssn"] = ssn_matches[0]
-        
-        # Extract disability info
-        disability_info = self.ocr_helpers.extract_disability_info(text)
-        data["disability_info"] = disability_info
-        
-        # Extract VA forms
-        va_forms = self.ocr_helpers.extract_va_forms(text)
-        if va_forms:
-            data["va_forms"] = va_forms
-            data["primary_form"] = va_forms[0]
-        
-        return data
-    
     def _extract_form_data(self, text: str, document_type: str) -> Dict[str, Any]:
         """Extract form-specific data based on document type."""
         data = {}
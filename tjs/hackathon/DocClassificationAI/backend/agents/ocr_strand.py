@@ -1,18 +1,101 @@
+import io
 import os
+import time
+import shutil
+import asyncio
+import tempfile
 import pytesseract
-from pdf2image import convert_from_path
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from PIL import Image
-from typing import Dict, Any
 from .base_strand import Strand
+from utils.ocr_engine import ParallelOCREngine
+from utils.page_source import PDFPageSource, TIFFPageSource
+from utils.pdf_text_layer import PDFTextLayer
+from utils.ocr_cache import OCRCache
+from utils.file_ops import FileOperations
+from utils.ocr_profiles import OCR_PROFILES, select_profile
+from utils.image_tiles import ImageTiler
+from utils.metrics import OCR_CHARACTERS, OCR_DURATION, OCR_PAGES
+from utils.progress import report_progress
+from utils.tracing import span
 import logging
 
+class _TextPrefix:
+    """
+    Tracks the in-order prefix of a document's text while pages finish out of order.
+    """
+    
+    def __init__(self, target_chars: int):
+        self.target_chars = target_chars
+        self.ready = asyncio.Event()
+        self._pages: Dict[int, str] = {}
+        self._parts: List[str] = []
+        self._length = 0
+        self._next_page = 1
+        
+    @property
+    def text(self) -> str:
+        return "\n".join(self._parts)
+    
+    def add_page(self, page_number: int, text: str):
+        """Record a finished page and signal once the prefix is long enough."""
+        self._pages[page_number] = text
+        while self._next_page in self._pages:
+            part = self._pages.pop(self._next_page)
+            # Length of the joined text: a separator before every part but the first
+            self._length += len(part) + (1 if self._parts else 0)
+            self._parts.append(part)
+            self._next_page += 1
+            
+        if self._length >= self.target_chars:
+            self.ready.set()
+
 class OCRStrand(Strand):
     """
     OCR Strand: Converts PDF and image files to text using Tesseract.
+    Born-digital PDF pages are read from their embedded text layer instead.
     """
     
-    def __init__(self):
+    # Documents OCR'd at once in streaming mode; their pages share the process pool
+    stage_workers = 2
+    
+    reads = ("file_path", "file_bytes", "file_size_mb", "ocr_profile", "file_sha256")
+    writes = ("extracted_text", "text_length", "page_count", "ocr_page_methods", "ocr_skipped_pages",
+              "ocr_profile", "file_sha256", "ocr_cache_hit", "ocr_duration_seconds", "ocr_pending", "file_bytes")
+    
+    def __init__(self, max_workers: Optional[int] = None, page_window: Optional[int] = None,
+                 use_text_layer: bool = True, use_cache: bool = True):
         super().__init__("ocr")
+        # Number of OCR worker processes (defaults to one per CPU core)
+        if max_workers is None and os.getenv("OCR_MAX_WORKERS"):
+            max_workers = int(os.getenv("OCR_MAX_WORKERS"))
+        # Pages per Tesseract invocation amortize process spawn and model load
+        self.ocr_engine = ParallelOCREngine(
+            max_workers=max_workers,
+            batch_size=int(os.getenv("OCR_BATCH_SIZE", "4"))
+        )
+        # Number of PDF pages rasterized at a time
+        self.page_window = page_window or int(os.getenv("OCR_PAGE_WINDOW", "8"))
+        # Embedded text layer reader for born-digital PDFs
+        self.text_layer = PDFTextLayer() if use_text_layer else None
+        # Content-addressed cache of OCR results for re-uploaded documents
+        self.ocr_cache = None
+        if use_cache:
+            self.ocr_cache = OCRCache(
+                cache_dir=os.getenv("OCR_CACHE_DIR", "data/ocr_cache"),
+                max_size_mb=float(os.getenv("OCR_CACHE_MAX_MB", "500"))
+            )
+        self._tesseract_version: Optional[str] = None
+        # Release this much leading text to downstream strands before OCR finishes
+        # (matches the classification strand's input budget; 0 disables)
+        self.early_release_chars = int(os.getenv("OCR_EARLY_RELEASE_CHARS", "4000"))
+        # Scanned pages with less ink than this fraction skip Tesseract (0 disables)
+        self.blank_ink_ratio = float(os.getenv("OCR_BLANK_INK_RATIO", "0.003"))
+        # Single pages larger than this many pixels are OCR'd as parallel bands (0 disables)
+        self.tiler = ImageTiler(
+            min_pixels=int(os.getenv("OCR_TILE_MIN_PIXELS", "16000000")),
+            max_tiles=self.ocr_engine.max_workers
+        )
         # Configure Tesseract path for macOS (adjust if needed)
         if os.path.exists("/opt/homebrew/bin/tesseract"):
             pytesseract.pytesseract.tesseract_cmd = "/opt/homebrew/bin/tesseract"
@@ -20,15 +103,24 @@ class OCRStrand(Strand):
             pytesseract.pytesseract.tesseract_cmd = "/usr/local/bin/tesseract"
     
     def validate_input(self, input_data: Dict[str, Any]) -> bool:
-        """Validate that file_path exists in input_data."""
-        return "file_path" in input_data and os.path.exists(input_data["file_path"])
+        """Validate that file_path exists in input_data, on disk or held in memory as file_bytes."""
+        return "file_path" in input_data and (input_data.get("file_bytes") is not None
+                                              or os.path.exists(input_data["file_path"]))
     
     async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract text from PDF or image files.
         
+        For multi-page PDFs and TIFFs the strand returns as soon as the in-order page text
+        reaches early_release_chars; 'extracted_text' then holds that prefix and
+        'ocr_pending' holds a task that finishes the rest in the background.
+        
+        Small image uploads may arrive as 'file_bytes' instead of a file on disk;
+        they are OCR'd from memory unless they need the on-disk path (several
+        frames, or large enough to tile), in which case they are written out first.
+        
         Args:
-            input_data: Dictionary containing 'file_path'
+            input_data: Dictionary containing 'file_path' (and optionally 'file_bytes')
             
         Returns:
             Dictionary with extracted text and metadata
@@ -37,20 +129,62 @@ class OCRStrand(Strand):
         file_extension = os.path.splitext(file_path)[1].lower()
         
         try:
-            if file_extension == ".pdf":
-                text = await self._extract_text_from_pdf(file_path)
-            elif file_extension in [".png", ".jpg", ".jpeg", ".tiff", ".bmp"]:
-                text = await self._extract_text_from_image(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
+            # Named DPI/preprocessing tradeoff, chosen per request or by file size
+            profile_name = select_profile(input_data.get("ocr_profile"), input_data.get("file_size_mb", 0.0))
+            profile = OCR_PROFILES[profile_name]
+            input_data["ocr_profile"] = profile_name
             
-            # Add OCR results to input_data
-            input_data["extracted_text"] = text
-            input_data["ocr_status"] = "success"
-            input_data["text_length"] = len(text)
-            
-            self.logger.info(f"Extracted {len(text)} characters from {file_path}")
+            # Byte-identical re-uploads skip straight to classification
+            cache_key = None
+            if self.ocr_cache:
+                if "file_sha256" not in input_data:
+                    input_data["file_sha256"] = await asyncio.to_thread(OCRCache.hash_file, file_path)
+                cache_key = OCRCache.make_key(input_data["file_sha256"], self._cache_config(profile))
+                cached = await asyncio.to_thread(self.ocr_cache.get, cache_key)
+                if cached:
+                    input_data.update(cached)
+                    input_data["ocr_status"] = "success"
+                    input_data["ocr_cache_hit"] = True
+                    self.logger.info(f"OCR cache hit for {file_path} ({cached['text_length']} characters)")
+                    return input_data
+                    
+            if file_extension not in [".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".tif", ".bmp"]:
+                raise ValueError(f"Unsupported file type: {file_extension}")
+                
+            # Multi-frame TIFFs and images large enough to tile are OCR'd from disk
+            file_bytes = input_data.get("file_bytes")
+            if file_bytes is not None and not await asyncio.to_thread(self._fits_in_memory, file_bytes, profile):
+                await asyncio.to_thread(FileOperations.write_in_memory_file, input_data)
+                file_bytes = None
+                
+            if (file_bytes is not None or file_extension not in [".pdf", ".tiff", ".tif"]
+                    or not self.early_release_chars):
+                input_data.update(await self._run_ocr(file_path, file_extension, profile, cache_key,
+                                                      file_bytes=file_bytes))
+                return input_data
+                
+            # Hand the first pages to classification while the rest are still OCR'd
+            prefix = _TextPrefix(self.early_release_chars)
+            ocr_task = asyncio.ensure_future(
+                self._run_ocr(file_path, file_extension, profile, cache_key, on_page_text=prefix.add_page)
+            )
+            prefix_ready = asyncio.ensure_future(prefix.ready.wait())
+            await asyncio.wait({ocr_task, prefix_ready}, return_when=asyncio.FIRST_COMPLETED)
+            prefix_ready.cancel()
             
+            if ocr_task.done():
+                input_data.update(ocr_task.result())
+                return input_data
+                
+            input_data["extracted_text"] = prefix.text
+            input_data["text_length"] = len(prefix.text)
+            input_data["ocr_status"] = "in_progress"
+            input_data["ocr_pending"] = ocr_task
+            report_progress("ocr", "in_progress", characters_released=len(prefix.text))
+            ocr_task.add_done_callback(self._report_background_ocr)
+            self.logger.info(f"Released first {len(prefix.text)} characters of {file_path}; "
+                           f"OCR continues in background")
+                           
             return input_data
             
         except Exception as e:
@@ -60,36 +194,316 @@ class OCRStrand(Strand):
             input_data["ocr_error"] = str(e)
             return input_data
     
-    async def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF using pdf2image and Tesseract."""
+    @staticmethod
+    def _report_background_ocr(task: asyncio.Future):
+        """Report the end of OCR that continued after the strand returned."""
+        if task.cancelled():
+            return
+        result = task.result()
+        if result["ocr_status"] == "success":
+            report_progress("ocr", "completed", page_count=result["page_count"])
+        else:
+            report_progress("ocr", "failed", error=result.get("ocr_error"))
+    
+    @staticmethod
+    def _page_progress(total_pages: int,
+                       on_page_text: Optional[Callable[[int, str], None]]) -> Callable[[int, str], None]:
+        """
+        Page callback reporting 'page n of total' progress before calling on_page_text.
+        
+        Args:
+            total_pages: Pages in the document
+            on_page_text: Callback to forward (page_number, text) to, if any
+            
+        Returns:
+            Callback receiving (page_number, text) as pages finish
+        """
+        pages_done = 0
+        
+        def on_page(page_number: int, text: str):
+            nonlocal pages_done
+            pages_done += 1
+            report_progress("ocr", "running", page=page_number, pages_done=pages_done, page_count=total_pages)
+            if on_page_text:
+                on_page_text(page_number, text)
+                
+        return on_page
+    
+    def _fits_in_memory(self, file_bytes: bytes, profile: Dict[str, Any]) -> bool:
+        """Whether an in-memory image can be OCR'd as one page without tiling."""
         try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path)
+            with Image.open(io.BytesIO(file_bytes)) as image:
+                if getattr(image, "n_frames", 1) > 1:
+                    return False
+            return self.tiler.tile_count(io.BytesIO(file_bytes), profile.get("max_pixels")) <= 1
+        except Exception:
+            # Let the on-disk path report unreadable images as it always has
+            return False
+    
+    async def _run_ocr(self, file_path: str, file_extension: str, profile: Dict[str, Any],
+                       cache_key: Optional[str],
+                       on_page_text: Optional[Callable[[int, str], None]] = None,
+                       file_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Extract the full text of a document.
+        
+        Never raises, so it can run as a background task; failures are
+        reported through 'ocr_status' and 'ocr_error' like the rest of the strand.
+        
+        Args:
+            file_path: Path to the document
+            file_extension: Lower-case file extension
+            profile: OCR profile settings
+            cache_key: OCR cache key, or None if caching is disabled
+            on_page_text: Optional callback receiving (page_number, text) as pages finish
+            file_bytes: Contents of a single-page image held in memory instead of on disk
             
-            # Extract text from each page
-            all_text = []
-            for i, image in enumerate(images):
-                self.logger.info(f"Processing PDF page {i+1}/{len(images)}")
-                text = pytesseract.image_to_string(image)
-                all_text.append(text)
+        Returns:
+            Dictionary of OCR fields to merge into the pipeline data
+        """
+        start_time = time.perf_counter()
+        
+        try:
+            if file_bytes is not None:
+                # The encoded image goes to the worker process as is, never touching disk
+                ocr_results = await self.ocr_engine.ocr_pages([(1, file_bytes)], total=1,
+                                                              options=self._ocr_options(profile))
+                text, page_methods = ocr_results[1]["text"], self._group_page_methods([], ocr_results)
+            elif file_extension == ".pdf":
+                text, page_methods = await self._extract_text_from_pdf(file_path, profile, on_page_text)
+            elif file_extension in [".tiff", ".tif"]:
+                text, page_methods = await self._extract_text_from_tiff(file_path, profile, on_page_text)
+            else:
+                text, page_methods = await self._extract_text_from_image(file_path, profile)
+                
+            result = {
+                "extracted_text": text,
+                "text_length": len(text),
+                "page_count": sum(len(pages) for pages in page_methods.values()),
+                "ocr_page_methods": page_methods,
+                "ocr_skipped_pages": page_methods["blank"]
+            }
             
-            return "\n".join(all_text)
+            if cache_key:
+                await asyncio.to_thread(self.ocr_cache.put, cache_key, result)
+                
+            for method, pages in page_methods.items():
+                OCR_PAGES.inc(len(pages), method=method)
+            OCR_CHARACTERS.inc(len(text))
+                
+            self.logger.info(f"Extracted {len(text)} characters from {file_path} "
+                           f"({len(page_methods['text_layer'])} text-layer pages, "
+                           f"{len(page_methods['tesseract'])} OCR pages, "
+                           f"{len(page_methods['blank'])} blank pages skipped)")
+                           
+            result["ocr_status"] = "success"
+            result["ocr_duration_seconds"] = round(time.perf_counter() - start_time, 3)
+            OCR_DURATION.observe(result["ocr_duration_seconds"])
+            result["ocr_cache_hit"] = False
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"OCR failed for {file_path}: {str(e)}")
+            return {
+                "extracted_text": "",
+                "text_length": 0,
+                "ocr_status": "failed",
+                "ocr_error": str(e)
+            }
+    
+    async def _extract_text_from_pdf(self, pdf_path: str, profile: Dict[str, Any],
+                                     on_page_text: Optional[Callable[[int, str], None]] = None
+                                     ) -> Tuple[str, Dict[str, List[int]]]:
+        """
+        Extract text from PDF, using the embedded text layer where it is usable
+        and pdf2image + Tesseract for the remaining (scanned) pages.
+        
+        Args:
+            pdf_path: Path to the PDF
+            profile: OCR profile settings (DPI, preprocessing)
+            on_page_text: Optional callback receiving (page_number, text) as pages finish
+        
+        Returns:
+            Tuple of (document text, page numbers grouped by extraction method)
+        """
+        try:
+            with PDFPageSource(pdf_path, window_size=self.page_window, dpi=profile["dpi"],
+                               grayscale=profile["grayscale"]) as page_source:
+                total_pages = await asyncio.to_thread(lambda: page_source.page_count)
+                on_page_text = self._page_progress(total_pages, on_page_text)
+                
+                # Born-digital pages need no rasterization or OCR at all
+                page_texts = {}
+                if self.text_layer:
+                    page_texts = await asyncio.to_thread(self.text_layer.extract_pages, pdf_path)
+                text_layer_pages = sorted(page_texts)
+                for page_number in text_layer_pages:
+                    on_page_text(page_number, page_texts[page_number])
+                scanned_pages = [n for n in range(1, total_pages + 1) if n not in page_texts]
+                # Only scanned pages are rasterized
+                page_source.page_numbers = scanned_pages
+                
+                if len(scanned_pages) == 1:
+                    # A lone scanned page (e.g. a large drawing) may be worth tiling
+                    [(page_number, page_path)] = await asyncio.to_thread(list, page_source.iter_pages())
+                    ocr_results = await self._ocr_page_image(page_path, profile, page_number)
+                    page_source.release(page_path)
+                    on_page_text(page_number, ocr_results[page_number]["text"])
+                elif scanned_pages:
+                    # Stream scanned pages to disk a window at a time and OCR them in
+                    # parallel, deleting each page image as soon as its text is captured
+                    ocr_results = await self.ocr_engine.ocr_pages(
+                        page_source.iter_pages(),
+                        total=len(scanned_pages),
+                        release_page=page_source.release,
+                        page_callback=on_page_text,
+                        options=self._ocr_options(profile)
+                    )
+                else:
+                    ocr_results = {}
+                    
+            page_texts.update({n: result["text"] for n, result in ocr_results.items()})
+            all_text = [page_texts.get(n, "") for n in range(1, total_pages + 1)]
+            page_methods = self._group_page_methods(text_layer_pages, ocr_results)
+            
+            return "\n".join(all_text), page_methods
             
         except Exception as e:
             self.logger.error(f"PDF processing failed: {str(e)}")
             raise
     
-    async def _extract_text_from_image(self, image_path: str) -> str:
-        """Extract text from image using Tesseract."""
+    async def _extract_text_from_tiff(self, tiff_path: str, profile: Dict[str, Any],
+                                      on_page_text: Optional[Callable[[int, str], None]] = None
+                                      ) -> Tuple[str, Dict[str, List[int]]]:
+        """
+        Extract text from every frame of a (possibly multi-page) TIFF.
+        
+        Frames are OCR'd in parallel like PDF pages and joined in frame order,
+        each preceded by a page marker.
+        
+        Args:
+            tiff_path: Path to the TIFF
+            profile: OCR profile settings (preprocessing)
+            on_page_text: Optional callback receiving (page_number, text) as frames finish
+            
+        Returns:
+            Tuple of (document text, page numbers grouped by extraction method)
+        """
         try:
-            # Open image
-            image = Image.open(image_path)
+            with TIFFPageSource(tiff_path) as page_source:
+                total_pages = await asyncio.to_thread(lambda: page_source.page_count)
+                if total_pages == 1:
+                    return await self._extract_text_from_image(tiff_path, profile)
+                    
+                self.logger.info(f"OCR of {total_pages}-frame TIFF {tiff_path}")
+                if on_page_text:
+                    # Frames reach early release formatted exactly as in the final text
+                    forward_page_text = on_page_text
+                    on_page_text = lambda n, text: forward_page_text(n, self._format_frame(n, text))
+                on_page_text = self._page_progress(total_pages, on_page_text)
+                # Frames are written to disk only as worker slots free up and
+                # deleted as soon as their text is captured
+                ocr_results = await self.ocr_engine.ocr_pages(
+                    page_source.iter_pages(),
+                    total=total_pages,
+                    release_page=page_source.release,
+                    page_callback=on_page_text,
+                    options=self._ocr_options(profile)
+                )
+                
+            all_text = [self._format_frame(n, ocr_results[n]["text"]) for n in range(1, total_pages + 1)]
             
-            # Extract text
-            text = pytesseract.image_to_string(image)
+            return "\n".join(all_text), self._group_page_methods([], ocr_results)
             
-            return text
+        except Exception as e:
+            self.logger.error(f"TIFF processing failed: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _format_frame(page_number: int, text: str) -> str:
+        """Text of one TIFF frame preceded by its page marker."""
+        return f"--- Page {page_number} ---\n{text}"
+    
+    async def _extract_text_from_image(self, image_path: str,
+                                       profile: Dict[str, Any]) -> Tuple[str, Dict[str, List[int]]]:
+        """Extract text from image using Tesseract."""
+        try:
+            ocr_results = await self._ocr_page_image(image_path, profile)
+            
+            return ocr_results[1]["text"], self._group_page_methods([], ocr_results)
             
         except Exception as e:
             self.logger.error(f"Image processing failed: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+    
+    async def _ocr_page_image(self, image_path: str, profile: Dict[str, Any],
+                              page_number: int = 1) -> Dict[int, Dict[str, Any]]:
+        """
+        OCR a single page image, splitting it into parallel bands if it is oversized.
+        
+        Args:
+            image_path: Path to the page image
+            profile: OCR profile settings
+            page_number: Page number to key the result by
+            
+        Returns:
+            Dictionary mapping page_number to its page result ('text', 'blank')
+        """
+        options = self._ocr_options(profile)
+        tiles = await asyncio.to_thread(self.tiler.tile_count, image_path, profile.get("max_pixels"))
+        if tiles <= 1:
+            # Extract text in a worker process so the event loop stays free;
+            # the worker reads the file itself rather than receiving pickled pixels
+            return await self.ocr_engine.ocr_pages([(page_number, image_path)], total=1, options=options)
+            
+        tile_dir = tempfile.mkdtemp(prefix="ocr_tiles_")
+        try:
+            # Tile results are recorded as 'ocr_page' spans under this one, numbered by band
+            with span("ocr_tiles", page=page_number, tiles=tiles):
+                tile_paths, overlaps = await asyncio.to_thread(self.tiler.split, image_path, tiles, tile_dir)
+                tile_results = await self.ocr_engine.ocr_pages(
+                    list(enumerate(tile_paths, start=1)), total=len(tile_paths), options=options
+                )
+        finally:
+            shutil.rmtree(tile_dir, ignore_errors=True)
+            
+        texts = [tile_results[n]["text"] for n in range(1, len(tile_paths) + 1)]
+        return {page_number: {
+            "text": self.tiler.merge(texts, overlaps),
+            "blank": all(result["blank"] for result in tile_results.values())
+        }}
+    
+    def _ocr_options(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Options passed to the OCR worker processes."""
+        return {"blank_ink_ratio": self.blank_ink_ratio, "profile": profile}
+    
+    def _group_page_methods(self, text_layer_pages: List[int],
+                            ocr_results: Dict[int, Dict[str, Any]]) -> Dict[str, List[int]]:
+        """Group page numbers by how their text was obtained."""
+        return {
+            "text_layer": text_layer_pages,
+            "tesseract": sorted(n for n, result in ocr_results.items() if not result["blank"]),
+            "blank": sorted(n for n, result in ocr_results.items() if result["blank"])
+        }
+    
+    def _cache_config(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Settings that change OCR output and therefore belong in the cache key."""
+        if self._tesseract_version is None:
+            try:
+                self._tesseract_version = str(pytesseract.get_tesseract_version())
+            except Exception:
+                self._tesseract_version = "unknown"
+                
+        return {
+            "profile": profile,
+            "tesseract_version": self._tesseract_version,
+            "blank_ink_ratio": self.blank_ink_ratio,
+            "tile_min_pixels": self.tiler.min_pixels,
+            "text_layer": bool(self.text_layer),
+            "text_layer_min_chars": self.text_layer.min_chars if self.text_layer else None,
+            "text_layer_min_alnum_ratio": self.text_layer.min_alnum_ratio if self.text_layer else None
+        }
+    
+    def shutdown(self):
+        """Stop the OCR worker processes."""
+        self.ocr_engine.shutdown()
@@ -1,9 +1,13 @@
 import os
 import shutil
 import re
+import asyncio
 from datetime import datetime
-from typing import Dict, Any, Set
+from typing import Dict, Any, Iterable, Optional, Set
 from .base_strand import Strand
+from utils.file_ops import FileOperations
+from utils.tracing import span
+from utils.veteran_registry import VeteranRegistry
 
 class RoutingStrand(Strand):
     """
@@ -14,7 +18,12 @@ class RoutingStrand(Strand):
     All documents for a veteran go under the same veteran folder regardless of confidence level.
     Categories: RDL, RCS, RDS, Medical_Evidence, VA_Forms, Lay_Statements, Legal_Documents, Other
     """
-
+    
+    reads = ("file_path", "file_bytes", "processing_route", "document_type", "confidence", "extracted_data",
+             "original_filename")
+    writes = ("final_path", "final_directory", "new_filename", "veteran_name_used",
+              "confidence_category", "document_category", "file_bytes")
+    
     def __init__(self, base_data_path: str = "data"):
         super().__init__("routing")
         # Use relative path from the backend directory
@@ -30,8 +39,11 @@ class RoutingStrand(Strand):
             "VA_Forms", "Lay_Statements", "Legal_Documents", "Other"
         ]
         
-        # Track veteran names for grouping
-        self.known_veterans: Set[str] = set()
+        # Veteran names for grouping, shared with every other process routing into this data directory
+        self.veteran_registry = VeteranRegistry(
+            db_path=os.getenv("VETERAN_REGISTRY_PATH", "data/veteran_registry.db"),
+            refresh_seconds=float(os.getenv("VETERAN_REGISTRY_REFRESH_SECONDS", "2"))
+        )
         self._load_existing_veterans()
 
     def validate_input(self, input_data: Dict[str, Any]) -> bool:
@@ -52,9 +64,12 @@ class RoutingStrand(Strand):
         # Get veteran name from extracted data
         veteran_name = self._get_veteran_name(extracted_data, input_data.get("original_filename", ""))
         
-        # Check if we should group with existing veteran
-        grouped_veteran = self._find_matching_veteran(veteran_name)
-        if grouped_veteran:
+        # Check if we should group with existing veteran; new veterans are registered
+        # atomically, so concurrent workers agree on one folder per veteran
+        grouped_veteran, registered = await asyncio.to_thread(
+            self.veteran_registry.resolve, veteran_name, self._find_matching_veteran
+        )
+        if grouped_veteran != veteran_name:
             veteran_name = grouped_veteran
             self.logger.info(f"Grouping with existing veteran: {veteran_name}")
         
@@ -77,12 +92,22 @@ class RoutingStrand(Strand):
                 new_filename = f"{base_name}_{counter}{ext}"
                 destination_path = os.path.join(destination_dir, new_filename)
                 counter += 1
+                
+            if input_data.get("file_bytes") is not None:
+                # Uploads kept in memory are written once, straight to their destination
+                with span("file_write"):
+                    FileOperations.write_in_memory_file(input_data, destination_path)
+            else:
+                with span("file_move"):
+                    shutil.move(original_file_path, destination_path)
+                    
+            # The veteran now has a document on disk; keep the name for grouping
+            try:
+                await asyncio.to_thread(self.veteran_registry.confirm, veteran_name)
+            except Exception as e:
+                # The file is routed either way; the folder is registered again at startup
+                self.logger.warning(f"Could not confirm veteran {veteran_name}: {str(e)}")
             
-            shutil.move(original_file_path, destination_path)
-
-            # Track this veteran
-            self.known_veterans.add(veteran_name)
-
             # Update input_data with results
             input_data["final_path"] = destination_path
             input_data["final_directory"] = destination_dir
@@ -98,6 +123,12 @@ class RoutingStrand(Strand):
 
         except Exception as e:
             self.logger.error(f"Routing failed: {str(e)}")
+            if registered:
+                # Don't group later documents under a veteran that has no documents
+                try:
+                    await asyncio.to_thread(self.veteran_registry.release, veteran_name)
+                except Exception as release_error:
+                    self.logger.warning(f"Could not release veteran {veteran_name}: {str(release_error)}")
             input_data["routing_status"] = "failed"
             input_data["routing_error"] = str(e)
             return input_data
@@ -252,13 +283,15 @@ class RoutingStrand(Strand):
                 return matches[0].replace('_', ' ')
         
         return ""
-
-    def _find_matching_veteran(self, current_name: str) -> str:
+    
+    def _find_matching_veteran(self, current_name: str,
+                               known_veterans: Optional[Iterable[str]] = None) -> Optional[str]:
         """
         Find if current name matches an existing veteran (for grouping documents).
         
         Args:
             current_name: Current extracted veteran name
+            known_veterans: Names to match against (defaults to the registered veterans)
             
         Returns:
             Existing veteran name if match found, None otherwise
@@ -270,7 +303,7 @@ class RoutingStrand(Strand):
         current_words = set(current_clean.split())
         
         # Look for existing veterans with similar names
-        for existing_veteran in self.known_veterans:
+        for existing_veteran in (known_veterans if known_veterans is not None else self.known_veterans):
             if existing_veteran == "Unknown_Veteran":
                 continue
                 
@@ -287,21 +320,26 @@ class RoutingStrand(Strand):
                 return existing_veteran
         
         return None
-
+    
+    @property
+    def known_veterans(self) -> Set[str]:
+        """Veteran names registered so far, by this or any other process."""
+        return self.veteran_registry.names()
+    
     def _load_existing_veterans(self):
-        """Load existing veteran folders to enable document grouping."""
+        """Register existing veteran folders (e.g. from before the registry) to enable document grouping."""
         try:
+            folders = []
             if os.path.exists(self.base_data_path):
                 for item in os.listdir(self.base_data_path):
                     if item.endswith('_docs') and os.path.isdir(os.path.join(self.base_data_path, item)):
-                        veteran_name = item[:-5]  # Remove '_docs' suffix
-                        self.known_veterans.add(veteran_name)
-                        
+                        folders.append(item[:-5])  # Remove '_docs' suffix
+            self.veteran_registry.add_many(folders)
+            
             self.logger.info(f"Loaded {len(self.known_veterans)} existing veterans for grouping")
         except Exception as e:
             self.logger.error(f"Error loading existing veterans: {e}")
-            self.known_veterans = set()
-
+    
     def _sanitize_name(self, name: str) -> str:
         """
         Sanitize name for file system use following FOLDER_STRUCTURE.md specifications.
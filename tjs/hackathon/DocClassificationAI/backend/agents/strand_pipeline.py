@@ -1,19 +1,105 @@
-from typing import List, Dict, Any
+import time
+import asyncio
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Iterable, Optional, Set, Tuple, Union
 from .base_strand import Strand
+from utils.metrics import PIPELINE_DOCUMENTS, PIPELINE_DURATION
+from utils.progress import report_progress, use_progress
+from utils.tracing import span, use_trace
 import logging
 
+class _Stage:
+    """
+    One strand in streaming mode: an input queue served by a fixed number of workers.
+    """
+    
+    def __init__(self, strand: Strand, workers: int):
+        self.strand = strand
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.active = 0
+        self.processed = 0
+        self.max_depth = 0
+    
+    def put(self, item: "_DocumentRun"):
+        self.queue.put_nowait(item)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+class _DocumentRun:
+    """
+    Progress of one document through the strands in streaming mode.
+    """
+    
+    def __init__(self, key: Any, data: Dict[str, Any]):
+        self.key = key
+        self.data = data
+        self.started: Set[int] = set()
+        self.done: Set[int] = set()
+        self.failed = False
+        self.started_at = time.perf_counter()
+
 class StrandPipeline:
     """
-    Orchestrates the execution of strands in sequence.
+    Orchestrates the execution of strands, one document at a time (process) or as
+    concurrent stages over a stream of documents (process_stream). Strands run in
+    list order except where their declared fields show they are independent.
     """
     
-    def __init__(self, strands: List[Strand]):
+    def __init__(self, strands: List[Strand], stage_workers: Optional[Dict[str, int]] = None):
         self.strands = strands
+        # Streaming-mode worker counts by strand name, overriding Strand.stage_workers
+        self.stage_workers = stage_workers or {}
         self.logger = logging.getLogger("strand_pipeline")
+        # Stages of the streams currently running, for queue depth reporting
+        self._active_streams: List[List[_Stage]] = []
+        self._processed: Dict[str, int] = {}
+    
+    @staticmethod
+    def parse_stage_workers(spec: Optional[str]) -> Dict[str, int]:
+        """
+        Parse a stage worker specification such as "ocr=2,classification=16".
+        
+        Args:
+            spec: Comma-separated strand=workers pairs
+            
+        Returns:
+            Dictionary mapping strand names to worker counts
+        """
+        stage_workers = {}
+        for part in (spec or "").split(","):
+            if "=" in part:
+                name, workers = part.split("=", 1)
+                stage_workers[name.strip()] = max(1, int(workers))
+        return stage_workers
+    
+    def get_dependencies(self) -> List[Set[int]]:
+        """
+        Work out which strands must finish before each strand can start.
+        
+        A strand depends on an earlier one when it reads a field the earlier
+        strand writes, writes a field the earlier strand reads or writes, or
+        either of them has not declared its fields. Strands with no such
+        conflict run concurrently.
+        
+        Returns:
+            For each strand, the indices of the strands it waits for
+        """
+        dependencies = []
+        for j, later in enumerate(self.strands):
+            depends_on = set()
+            for i, earlier in enumerate(self.strands[:j]):
+                if None in (earlier.reads, earlier.writes, later.reads, later.writes):
+                    depends_on.add(i)
+                    continue
+                earlier_writes = set(earlier.writes)
+                if (earlier_writes & set(later.reads) or earlier_writes & set(later.writes)
+                        or set(earlier.reads) & set(later.writes)):
+                    depends_on.add(i)
+            dependencies.append(depends_on)
+        return dependencies
     
     async def process(self, initial_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Process data through all strands in sequence.
+        Process data through all strands, running independent strands concurrently.
         
         Args:
             initial_data: Initial data to process
@@ -23,28 +109,221 @@ class StrandPipeline:
         """
         self.logger.info(f"Starting pipeline with {len(self.strands)} strands")
         
+        start_time = time.perf_counter()
         current_data = initial_data.copy()
+        dependencies = self.get_dependencies()
+        done: Set[int] = set()
+        running: Dict[asyncio.Future, int] = {}
+        failed = False
         
-        for i, strand in enumerate(self.strands):
-            try:
-                self.logger.info(f"Executing strand {i+1}/{len(self.strands)}: {strand.name}")
+        while True:
+            if not failed:
+                for i, strand in enumerate(self.strands):
+                    if i not in done and i not in running.values() and dependencies[i] <= done:
+                        self.logger.info(f"Executing strand {i+1}/{len(self.strands)}: {strand.name}")
+                        running[asyncio.ensure_future(self._run_strand(strand, current_data))] = i
+            if not running:
+                break
+                
+            # Strands already started always finish, even once another has failed
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                done.add(running.pop(task))
+                result, ok = task.result()
+                if result is not current_data:
+                    current_data.update(result)
+                failed = failed or not ok
                 
-                # Execute strand
-                current_data = await strand.execute(current_data)
+        # Never leave OCR running past the end of the pipeline
+        await self._await_pending_ocr(current_data)
+        self._record_document(start_time, failed)
+        
+        self.logger.info("Pipeline execution completed")
+        return current_data
+    
+    async def process_stream(self, documents: Union[Iterable[Tuple[Any, Dict[str, Any]]],
+                                                    AsyncIterable[Tuple[Any, Dict[str, Any]]]]
+                             ) -> AsyncIterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Process many documents with every strand running as its own stage.
+        
+        Each strand gets an input queue and its own pool of workers, so documents
+        move through like an assembly line: one document is classified while the
+        next is OCR'd and the one before is routed. Batch throughput is then
+        bounded by the slowest stage rather than the sum of all of them. Within a
+        document, independent strands are queued at the same time, as in process.
+        
+        Args:
+            documents: (key, initial_data) pairs, sync or async; keys identify
+                results, which are yielded in completion order
                 
+        Yields:
+            (key, final_data) pairs as documents leave the pipeline
+        """
+        stages = [_Stage(strand, self._workers_for(strand)) for strand in self.strands]
+        dependencies = self.get_dependencies()
+        finished: asyncio.Queue = asyncio.Queue()
+        self._active_streams.append(stages)
+        self.logger.info("Starting streaming pipeline: " +
+                         ", ".join(f"{stage.strand.name} x{stage.workers}" for stage in stages))
+        
+        async def advance(run: _DocumentRun):
+            """Queue every strand the document is now ready for, or finish the document."""
+            if not run.failed:
+                for i in range(len(stages)):
+                    if i not in run.started and dependencies[i] <= run.done:
+                        run.started.add(i)
+                        stages[i].put(run)
+            if len(run.started) == len(run.done):
+                await self._await_pending_ocr(run.data)
+                self._record_document(run.started_at, run.failed)
+                finished.put_nowait((run.key, run.data))
+        
+        async def stage_worker(index: int, stage: _Stage):
+            while True:
+                run = await stage.queue.get()
+                stage.active += 1
+                try:
+                    data, ok = await self._run_strand(stage.strand, run.data)
+                finally:
+                    stage.active -= 1
+                    stage.processed += 1
+                    self._processed[stage.strand.name] = self._processed.get(stage.strand.name, 0) + 1
+                    
+                if data is not run.data:
+                    run.data.update(data)
+                run.done.add(index)
+                run.failed = run.failed or not ok
+                await advance(run)
+        
+        async def feed() -> int:
+            count = 0
+            if hasattr(documents, "__aiter__"):
+                async for key, data in documents:
+                    await advance(_DocumentRun(key, data.copy()))
+                    count += 1
+            else:
+                for key, data in documents:
+                    await advance(_DocumentRun(key, data.copy()))
+                    count += 1
+            return count
+            
+        workers = [asyncio.ensure_future(stage_worker(index, stage))
+                   for index, stage in enumerate(stages) for _ in range(stage.workers)]
+        feeder = asyncio.ensure_future(feed())
+        
+        try:
+            yielded = 0
+            while not feeder.done() or yielded < feeder.result():
+                getter = asyncio.ensure_future(finished.get())
+                await asyncio.wait({getter, feeder} if not feeder.done() else {getter},
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    # Feeding finished (or raised); re-check the loop condition
+                    feeder.result()
+                    continue
+                yielded += 1
+                yield getter.result()
+        finally:
+            feeder.cancel()
+            for worker in workers:
+                worker.cancel()
+            self._active_streams.remove(stages)
+            self.logger.info("Streaming pipeline completed; max queue depth " +
+                             ", ".join(f"{stage.strand.name}={stage.max_depth}" for stage in stages))
+    
+    def _record_document(self, start_time: float, failed: bool):
+        """Count a document leaving the pipeline and how long it took."""
+        PIPELINE_DURATION.observe(time.perf_counter() - start_time)
+        PIPELINE_DOCUMENTS.inc(status="failed" if failed else "success")
+    
+    def _workers_for(self, strand: Strand) -> int:
+        return max(1, self.stage_workers.get(strand.name, strand.stage_workers))
+    
+    def get_stage_stats(self) -> List[Dict[str, Any]]:
+        """
+        Per-stage queue depth and worker activity across running streams.
+        
+        Returns:
+            One entry per strand with queued and active documents, configured
+            workers and documents processed since startup
+        """
+        stats = []
+        for i, strand in enumerate(self.strands):
+            stages = [stream[i] for stream in self._active_streams if i < len(stream)]
+            stats.append({
+                "strand": strand.name,
+                "workers": self._workers_for(strand),
+                "queued": sum(stage.queue.qsize() for stage in stages),
+                "active": sum(stage.active for stage in stages),
+                "max_queued": max((stage.max_depth for stage in stages), default=0),
+                "processed": self._processed.get(strand.name, 0)
+            })
+        return stats
+    
+    async def _run_strand(self, strand: Strand, data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run one strand on a document.
+        
+        Args:
+            strand: Strand to run
+            data: Pipeline data for the document
+            
+        Returns:
+            Tuple of (updated data, whether the document should continue down the pipeline)
+        """
+        with use_progress(data.get("progress")):
+            try:
+                # Strands that need the whole document wait for background OCR
+                if not strand.accepts_partial_text:
+                    await self._await_pending_ocr(data)
+                    if data.get("ocr_status") == "failed":
+                        self.logger.error("Background OCR failed, stopping pipeline")
+                        return data, False
+                        
+                # Execute strand; the document's trace and progress listener stay
+                # current for everything it calls
+                report_progress(strand.name, "started")
+                with use_trace(data.get("trace")), span(f"strand.{strand.name}"):
+                    data = await strand.execute(data)
+                    
                 # Check if strand failed
-                if f"{strand.name}_status" in current_data and current_data[f"{strand.name}_status"] == "failed":
+                if f"{strand.name}_status" in data and data[f"{strand.name}_status"] == "failed":
                     self.logger.error(f"Strand {strand.name} failed, stopping pipeline")
-                    break
+                    report_progress(strand.name, "failed", error=data.get(f"{strand.name}_error"))
+                    return data, False
+                    
+                # A strand still working in the background (OCR) reports completion itself
+                if data.get(f"{strand.name}_status") != "in_progress":
+                    report_progress(strand.name, "completed")
+                return data, True
                 
             except Exception as e:
                 self.logger.error(f"Unexpected error in strand {strand.name}: {str(e)}")
-                current_data[f"{strand.name}_error"] = str(e)
-                current_data[f"{strand.name}_status"] = "failed"
-                break
+                data[f"{strand.name}_error"] = str(e)
+                data[f"{strand.name}_status"] = "failed"
+                report_progress(strand.name, "failed", error=str(e))
+                return data, False
+    
+    async def _await_pending_ocr(self, data: Dict[str, Any]):
+        """
+        Wait for OCR still running in the background and merge its full results.
         
-        self.logger.info("Pipeline execution completed")
-        return current_data
+        Args:
+            data: Pipeline data, possibly holding an 'ocr_pending' task
+        """
+        pending = data.get("ocr_pending")
+        if pending is None:
+            return
+        
+        self.logger.info("Waiting for background OCR to finish")
+        with use_trace(data.get("trace")), span("ocr_wait"):
+            result = await pending
+        # Concurrent strands may wait on the same OCR task; merge its results once
+        if data.get("ocr_pending") is pending:
+            del data["ocr_pending"]
+            data.update(result)
     
     def add_strand(self, strand: Strand):
         """Add a strand to the pipeline."""
@@ -56,4 +335,4 @@ class StrandPipeline:
     
     def get_strand_names(self) -> List[str]:
         """Get list of strand names in the pipeline."""
-        return [strand.name for strand in self.strands] 
\ No newline at end of file
+        return [strand.name for strand in self.strands] 
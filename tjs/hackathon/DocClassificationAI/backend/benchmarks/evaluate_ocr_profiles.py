@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Speed/accuracy comparison of the OCR profiles.
+
+OCRs each document once per profile (text layer and cache disabled, so every
+page goes through Tesseract) and reports throughput alongside text similarity
+to the 'accurate' profile's output, which serves as the reference.
+
+Usage (from backend/):
+    python benchmarks/evaluate_ocr_profiles.py
+    python benchmarks/evaluate_ocr_profiles.py --files data/some_scan.pdf photo.jpg
+    python benchmarks/evaluate_ocr_profiles.py --limit 5 --profiles fast balanced accurate
+"""
+
+import os
+import sys
+import glob
+import time
+import asyncio
+import difflib
+import argparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from agents.ocr_strand import OCRStrand
+from utils.ocr_profiles import OCR_PROFILES
+
+REFERENCE_PROFILE = "accurate"
+# SequenceMatcher is quadratic; compare only the leading text of long documents
+MAX_COMPARE_CHARS = 20000
+
+
+def find_sample_files(limit: int):
+    """Documents already routed into backend/data, excluding extracted data."""
+    patterns = ["*.pdf", "*.png", "*.jpg", "*.jpeg", "*.tiff", "*.tif", "*.bmp"]
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(os.path.join(BACKEND_DIR, "data", "**", pattern), recursive=True))
+    files = [f for f in sorted(files) if os.sep + "extracted_data" + os.sep not in f]
+    return files[:limit]
+
+
+async def ocr_with_profile(strand: OCRStrand, file_path: str, profile_name: str):
+    """OCR one file with one profile; returns (seconds, text)."""
+    start = time.perf_counter()
+    result = await strand.run({
+        "file_path": file_path,
+        "ocr_profile": profile_name,
+        "file_size_mb": os.path.getsize(file_path) / (1024 * 1024)
+    })
+    seconds = time.perf_counter() - start
+    if result.get("ocr_status") != "success":
+        raise RuntimeError(result.get("ocr_error", "OCR failed"))
+    return seconds, result["extracted_text"]
+
+
+def similarity(text: str, reference: str) -> float:
+    """Word-level similarity ratio between two OCR outputs."""
+    return difflib.SequenceMatcher(None, text[:MAX_COMPARE_CHARS].split(),
+                                   reference[:MAX_COMPARE_CHARS].split(), autojunk=False).ratio()
+
+
+async def evaluate(files, profiles):
+    strand = OCRStrand(use_text_layer=False, use_cache=False)
+    strand.early_release_chars = 0
+    totals = {name: {"seconds": 0.0, "chars": 0, "similarity": []} for name in profiles}
+    
+    try:
+        print(f"{'document':<44}{'profile':<10}{'seconds':>9}{'chars':>8}{'chars/s':>9}{'similarity':>12}")
+        for file_path in files:
+            outputs = {}
+            for name in profiles:
+                try:
+                    outputs[name] = await ocr_with_profile(strand, file_path, name)
+                except Exception as e:
+                    print(f"{os.path.basename(file_path)[:42]:<44}{name:<10} failed: {e}")
+                    
+            reference = outputs.get(REFERENCE_PROFILE, (0, None))[1]
+            for name, (seconds, text) in outputs.items():
+                score = similarity(text, reference) if reference is not None else None
+                totals[name]["seconds"] += seconds
+                totals[name]["chars"] += len(text)
+                if score is not None:
+                    totals[name]["similarity"].append(score)
+                print(f"{os.path.basename(file_path)[:42]:<44}{name:<10}{seconds:>9.2f}{len(text):>8}"
+                      f"{len(text) / max(seconds, 1e-6):>9.0f}{'-' if score is None else f'{score:.3f}':>12}")
+    finally:
+        strand.shutdown()
+        
+    print(f"\n{'profile':<10}{'seconds':>9}{'chars/s':>9}{'mean similarity':>17}")
+    for name, total in totals.items():
+        scores = total["similarity"]
+        mean = f"{sum(scores) / len(scores):.3f}" if scores else "-"
+        print(f"{name:<10}{total['seconds']:>9.2f}{total['chars'] / max(total['seconds'], 1e-6):>9.0f}{mean:>17}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR profile speed and accuracy")
+    parser.add_argument("--files", nargs="+", help="Documents to OCR (default: samples under data/)")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum number of sample documents")
+    parser.add_argument("--profiles", nargs="+", choices=list(OCR_PROFILES), default=list(OCR_PROFILES))
+    args = parser.parse_args()
+    
+    files = args.files or find_sample_files(args.limit)
+    if not files:
+        parser.error("no documents found; pass --files")
+        
+    profiles = list(args.profiles)
+    if REFERENCE_PROFILE not in profiles:
+        profiles.append(REFERENCE_PROFILE)
+        
+    asyncio.run(evaluate(files, profiles))
+
+
+if __name__ == "__main__":
+    main()
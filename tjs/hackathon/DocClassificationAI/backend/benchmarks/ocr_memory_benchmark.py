@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Peak-memory benchmark for PDF rasterization.
+
+Compares the old eager path (convert_from_path on the whole document, every
+page held in memory) with the windowed PDFPageSource used by OCRStrand, over
+increasing page counts. Each run happens in a fresh process so peak RSS is
+measured independently. The streaming column should stay flat as pages grow.
+
+Usage (from backend/):
+    python benchmarks/ocr_memory_benchmark.py
+    python benchmarks/ocr_memory_benchmark.py --pages 10 100 300 --ocr
+    python benchmarks/ocr_memory_benchmark.py --pdf data/some_scan.pdf
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import subprocess
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def make_sample_pdf(path: str, pages: int):
+    """Write a letter-size, text-bearing PDF with the given number of pages."""
+    from PIL import Image, ImageDraw
+
+    page = Image.new("L", (1275, 1650), 255)  # 8.5x11in at 150 DPI
+    draw = ImageDraw.Draw(page)
+    for line in range(40):
+        draw.text((100, 100 + line * 35), f"Line {line + 1}: VA benchmark sample text 0123456789", fill=0)
+
+    # The same image object repeated costs no extra memory while encoding
+    page.save(path, "PDF", resolution=150, save_all=True, append_images=[page] * (pages - 1))
+
+
+def run_eager(pdf_path: str, dpi: int, ocr: bool) -> dict:
+    """Rasterize every page into memory at once (the pre-streaming behaviour)."""
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path, dpi=dpi)
+    if ocr:
+        import pytesseract
+        for image in images:
+            pytesseract.image_to_string(image)
+    return {"pages": len(images)}
+
+
+def run_streaming(pdf_path: str, dpi: int, ocr: bool) -> dict:
+    """Rasterize through PDFPageSource, releasing each page as it is consumed."""
+    from utils.page_source import PDFPageSource
+
+    if ocr:
+        from agents.ocr_strand import OCRStrand
+        from utils.ocr_profiles import OCR_PROFILES
+        strand = OCRStrand()
+        profile = dict(OCR_PROFILES["balanced"], dpi=dpi)
+        try:
+            text, _ = asyncio.run(strand._extract_text_from_pdf(pdf_path, profile))
+        finally:
+            strand.shutdown()
+        return {"characters": len(text)}
+
+    pages = 0
+    with PDFPageSource(pdf_path, dpi=dpi) as page_source:
+        for _, page_path in page_source.iter_pages():
+            pages += 1
+            page_source.release(page_path)
+    return {"pages": pages}
+
+
+def run_child(args):
+    """Entry point for a single measured run; prints one JSON line."""
+    runner = run_eager if args.child == "eager" else run_streaming
+    start = time.perf_counter()
+    result = runner(args.pdf, args.dpi, args.ocr)
+    result.update({
+        "mode": args.child,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    })
+    print(json.dumps(result))
+
+
+def measure(mode: str, pdf_path: str, dpi: int, ocr: bool) -> dict:
+    """Run one mode in a fresh interpreter and return its measurements."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode,
+               "--pdf", pdf_path, "--dpi", str(dpi)]
+    if ocr:
+        command.append("--ocr")
+    output = subprocess.run(command, capture_output=True, text=True, check=True, cwd=BACKEND_DIR)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of PDF rasterization")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 150],
+                        help="Page counts for generated sample PDFs")
+    parser.add_argument("--pdf", help="Benchmark an existing PDF instead of generated samples")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--ocr", action="store_true", help="Include OCR, not just rasterization")
+    parser.add_argument("--child", choices=["eager", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.pdf:
+            samples = [os.path.abspath(args.pdf)]
+        else:
+            samples = []
+            for pages in args.pages:
+                sample_path = os.path.join(temp_dir, f"sample_{pages}p.pdf")
+                make_sample_pdf(sample_path, pages)
+                samples.append(sample_path)
+
+        print(f"{'document':<28}{'eager MB':>12}{'eager s':>10}{'stream MB':>12}{'stream s':>10}")
+        for sample_path in samples:
+            eager = measure("eager", sample_path, args.dpi, args.ocr)
+            streaming = measure("streaming", sample_path, args.dpi, args.ocr)
+            print(f"{os.path.basename(sample_path):<28}"
+                  f"{eager['peak_rss_mb']:>12}{eager['seconds']:>10}"
+                  f"{streaming['peak_rss_mb']:>12}{streaming['seconds']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark of batched Tesseract invocation against one process per page.
+
+Generates short text pages (the case where process spawn and model load
+dominate), then OCRs them in a single process either page by page with
+pytesseract.image_to_string or in batches through ocr_page_batch, which
+sends each batch to one Tesseract invocation.
+
+Usage (from backend/):
+    python benchmarks/tesseract_batch_benchmark.py
+    python benchmarks/tesseract_batch_benchmark.py --pages 40 --batch-sizes 1 4 8 16 --lines 5
+    python benchmarks/tesseract_batch_benchmark.py --images data/some_dir/*.png
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import pytesseract
+from utils.ocr_engine import ocr_page_batch
+
+
+def make_sample_pages(directory: str, pages: int, lines: int):
+    """Write short letter-size text pages as PNG files."""
+    from PIL import Image, ImageDraw, ImageFont
+    
+    try:
+        font = ImageFont.load_default(size=28)
+    except TypeError:
+        font = ImageFont.load_default()
+        
+    paths = []
+    for page_number in range(1, pages + 1):
+        page = Image.new("L", (1700, 2200), 255)  # 8.5x11in at 200 DPI
+        draw = ImageDraw.Draw(page)
+        for line in range(lines):
+            draw.text((150, 150 + line * 45),
+                      f"Page {page_number} line {line + 1}: Department of Veterans Affairs",
+                      fill=0, font=font)
+        path = os.path.join(directory, f"page_{page_number:04d}.png")
+        page.save(path)
+        paths.append(path)
+    return paths
+
+
+def time_per_page(paths):
+    """OCR every page with its own Tesseract process."""
+    start = time.perf_counter()
+    texts = [pytesseract.image_to_string(path) for path in paths]
+    return time.perf_counter() - start, texts
+
+
+def time_batched(paths, batch_size: int):
+    """OCR pages in batches, one Tesseract process per batch."""
+    start = time.perf_counter()
+    texts = []
+    for i in range(0, len(paths), batch_size):
+        texts.extend(result["text"] for result in ocr_page_batch(paths[i:i + batch_size], {}))
+    return time.perf_counter() - start, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs per-page Tesseract calls")
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--lines", type=int, default=6, help="Text lines per generated page")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--images", nargs="+", help="Use existing page images instead of generated ones")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = args.images or make_sample_pages(temp_dir, args.pages, args.lines)
+        print(f"Tesseract {pytesseract.get_tesseract_version()}, {len(paths)} pages, single process")
+        
+        baseline_seconds, baseline_texts = time_per_page(paths)
+        print(f"{'mode':<16}{'seconds':>10}{'pages/s':>10}{'speedup':>10}{'same text':>11}")
+        print(f"{'per-page':<16}{baseline_seconds:>10.2f}{len(paths) / baseline_seconds:>10.1f}{1.0:>10.2f}{'-':>11}")
+        
+        for batch_size in args.batch_sizes:
+            seconds, texts = time_batched(paths, batch_size)
+            same = sum(a.strip() == b.strip() for a, b in zip(baseline_texts, texts))
+            print(f"{f'batch={batch_size}':<16}{seconds:>10.2f}{len(paths) / seconds:>10.1f}"
+                  f"{baseline_seconds / seconds:>10.2f}{f'{same}/{len(paths)}':>11}")
+
+
+if __name__ == "__main__":
+    main()
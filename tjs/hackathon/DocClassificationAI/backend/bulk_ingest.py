@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Offline bulk ingestion for VA Document Classification System
+
+Walks a directory tree and runs every supported file through the strand
+pipeline in a pool of worker processes, without going through the HTTP API.
+Source files are left in place; a copy of each is classified and routed like
+an upload, and files whose content was already routed are recorded as
+duplicates. Workers record every outcome in a SQLite manifest (path, content
+hash, status, result) as each file finishes, so an interrupted run resumes
+without redoing finished files:
+
+    python bulk_ingest.py /archive/scans --workers 4
+    python bulk_ingest.py /archive/scans --dry-run
+"""
+
+import os
+import sys
+import glob
+import time
+import uuid
+import shutil
+import asyncio
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.file_ops import FileOperations
+from utils.ingest_manifest import IngestManifest
+from utils.ocr_cache import OCRCache
+from utils.page_source import count_pages
+from utils.tracing import TraceLog, create_trace_log
+
+# Event loop of a worker process, kept across batches so the pipeline's
+# stage workers and OCR process pool are set up once per process
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+# Manifest a worker records each file's outcome in as soon as it finishes
+_worker_manifest: Optional[IngestManifest] = None
+_worker_trace_log: Optional[TraceLog] = None
+
+
+def find_files(root: str, file_ops: FileOperations) -> Iterator[str]:
+    """Supported files under root, in a stable order."""
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if file_ops.validate_file_type(filename):
+                yield os.path.abspath(os.path.join(directory, filename))
+
+
+def batch_copies(upload_dir: str, batch_id: str) -> List[str]:
+    """Copies of a batch's files in the uploads directory that were not routed away."""
+    return glob.glob(os.path.join(glob.escape(upload_dir), f"bulk_{batch_id}_*"))
+
+
+def _init_worker(ocr_workers: int, manifest_path: str):
+    """Configure a worker process before the pipeline is imported."""
+    global _worker_loop, _worker_manifest, _worker_trace_log
+    os.environ["OCR_MAX_WORKERS"] = str(ocr_workers)
+    logging.basicConfig(level=logging.WARNING,
+                        format=f"%(asctime)s - %(name)s - %(levelname)s - [pid {os.getpid()}] %(message)s")
+    _worker_loop = asyncio.new_event_loop()
+    _worker_manifest = IngestManifest(manifest_path)
+    # Traces of each worker go to their own file, so processes never rotate each other's
+    _worker_trace_log = create_trace_log(f"bulk-{os.getpid()}")
+
+
+def process_batch(batch_id: str, files: List[Tuple[str, int, float]],
+                  ocr_profile: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Run a batch of source files through the strand pipeline (in a worker process).
+    
+    Each outcome is recorded in the manifest as soon as its file finishes, so
+    files already routed are not lost if the process dies mid-batch.
+    
+    Args:
+        batch_id: Identifier naming the batch's copies in the uploads directory
+        files: (path, size, mtime) of each source file
+        ocr_profile: Optional OCR profile name
+        
+    Returns:
+        One outcome per file (path, sha256, status, pages, result and error)
+    """
+    return _worker_loop.run_until_complete(_process_batch(batch_id, files, ocr_profile))
+
+
+async def _process_batch(batch_id: str, files: List[Tuple[str, int, float]],
+                         ocr_profile: Optional[str]) -> List[Dict[str, Any]]:
+    # Imported here so only worker processes load the models and LLM clients
+    from main import file_ops, strand_pipeline, pipeline_input, to_document_result
+    
+    def record(index: int):
+        path, size, mtime = files[index]
+        outcome = outcomes[index]
+        _worker_manifest.record(path, size, mtime, outcome["status"], sha256=outcome["sha256"],
+                                pages=outcome["pages"], result=outcome["result"], error=outcome["error"])
+        
+    started = time.monotonic()
+    outcomes: Dict[int, Dict[str, Any]] = {}
+    documents = []
+    copies = []
+    for index, (path, size, mtime) in enumerate(files):
+        outcome = {"path": path, "sha256": None, "status": "failed", "pages": None, "result": None, "error": None}
+        outcomes[index] = outcome
+        try:
+            # A retried batch may hold files a dead worker had already routed
+            entry = _worker_manifest.entry(path)
+            if entry and entry["status"] == "done" and (entry["size"], entry["mtime"]) == (size, mtime):
+                outcome.update(sha256=entry["sha256"], status="done", pages=entry["pages"], result=entry["result"])
+                continue
+            outcome["sha256"] = OCRCache.hash_file(path)
+            processed = _worker_manifest.find_by_hash(outcome["sha256"])
+            if processed:
+                # Already routed, from this path (touched since) or another one
+                if processed["path"] == path:
+                    outcome.update(status="done", result=processed["result"])
+                else:
+                    outcome.update(status="duplicate", result={"duplicate_of": processed["path"]})
+                record(index)
+                continue
+            # Routing moves the processed file, so the pipeline gets a copy in the uploads directory
+            copy_path = os.path.join(file_ops.upload_dir, f"bulk_{batch_id}_{index}{os.path.splitext(path)[1]}")
+            shutil.copyfile(path, copy_path)
+            copies.append(copy_path)
+        except Exception as e:
+            outcome["error"] = f"Could not read file: {str(e)}"
+            record(index)
+            continue
+        data = pipeline_input(copy_path, os.path.basename(path), ocr_profile)
+        data["file_sha256"] = outcome["sha256"]
+        data["trace"].attributes["source_path"] = path
+        documents.append((index, data))
+        
+    pending = {index for index, _ in documents}
+    try:
+        async for index, result in strand_pipeline.process_stream(documents):
+            _worker_trace_log.write(result.get("trace"))
+            document_result = to_document_result(result)
+            outcome = outcomes[index]
+            outcome["status"] = "done" if document_result.status == "success" else "failed"
+            outcome["pages"] = result.get("page_count")
+            outcome["result"] = document_result.model_dump(exclude={"trace"})
+            outcome["error"] = document_result.error or next(
+                (str(result[key]) for key in result if key.endswith("_error") and result[key]), None)
+            record(index)
+            pending.discard(index)
+    except Exception as e:
+        for index in sorted(pending):
+            outcomes[index]["error"] = str(e)
+            record(index)
+    finally:
+        # Routing moves the copies of routed files; the source is still in place for the rest
+        for copy_path in copies:
+            if os.path.exists(copy_path):
+                os.remove(copy_path)
+                
+    # Share the worker's time on the batch (excluding time queued behind other
+    # batches) by page, for time-per-page estimates
+    elapsed = time.monotonic() - started
+    processed = [outcomes[index] for index, _ in documents]
+    batch_pages = sum(outcome["pages"] or 0 for outcome in processed)
+    if batch_pages:
+        _worker_manifest.set_durations({outcome["path"]: elapsed * (outcome["pages"] or 0) / batch_pages
+                                        for outcome in processed if outcome["status"] == "done"})
+    return [outcomes[index] for index in range(len(files))]
+
+
+class Progress:
+    """
+    Throughput and ETA line for a running ingestion.
+    """
+    
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.pages = 0
+        self.started = time.monotonic()
+        self._last_print = 0.0
+        self._tty = sys.stderr.isatty()
+    
+    def update(self, outcomes: List[Dict[str, Any]]):
+        for outcome in outcomes:
+            self.done += 1
+            self.failed += outcome["status"] == "failed"
+            self.pages += outcome["pages"] or 0
+        self.show()
+    
+    def show(self, final: bool = False):
+        now = time.monotonic()
+        if not final and now - self._last_print < self.interval:
+            return
+        self._last_print = now
+        elapsed = max(now - self.started, 1e-6)
+        rate = self.done / elapsed
+        eta = (self.total - self.done) / rate if rate else None
+        line = (f"{self.done}/{self.total} files ({self.failed} failed) | "
+                f"{rate * 60:.1f} files/min, {self.pages / elapsed * 60:.1f} pages/min | "
+                f"elapsed {format_duration(elapsed)}, ETA {format_duration(eta) if eta is not None else '?'}")
+        if self._tty:
+            print(f"\r{line}\033[K", end="\n" if final else "", file=sys.stderr, flush=True)
+        else:
+            print(line, file=sys.stderr, flush=True)
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. '1h02m' or '3m05s'."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def select_files(root: str, manifest: IngestManifest, max_attempts: int,
+                 file_ops: FileOperations) -> Tuple[List[Tuple[str, int, float]], int]:
+    """
+    Find the files still to process.
+    
+    Files recorded as done or duplicate, or as failed max_attempts times, are
+    skipped unless they changed on disk since.
+    
+    Returns:
+        (path, size, mtime) of each file to process, and the number skipped
+    """
+    entries = manifest.entries()
+    pending = []
+    skipped = 0
+    for path in find_files(root, file_ops):
+        stat = os.stat(path)
+        entry = entries.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            if entry[2] in ("done", "duplicate") or entry[3] >= max_attempts:
+                skipped += 1
+                continue
+        pending.append((path, stat.st_size, stat.st_mtime))
+    return pending, skipped
+
+
+def dry_run(pending: List[Tuple[str, int, float]], manifest: IngestManifest, workers: int,
+            seconds_per_page: Optional[float]):
+    """Count the pages still to process and estimate how long they would take."""
+    pages = 0
+    megabytes = sum(size for _, size, _ in pending) / (1024 * 1024)
+    # Page counting mostly waits on pdfinfo subprocesses, so threads are enough
+    with ThreadPoolExecutor(max_workers=workers * 2) as executor:
+        for index, page_count in enumerate(executor.map(count_pages, [path for path, _, _ in pending]), 1):
+            pages += page_count
+            if index % 500 == 0:
+                print(f"  counted pages of {index}/{len(pending)} files...", file=sys.stderr)
+                
+    measured = manifest.seconds_per_page()
+    per_page = seconds_per_page or measured or 2.0
+    source = ("--seconds-per-page" if seconds_per_page else
+              "previous runs" if measured else "default guess; pass --seconds-per-page")
+    print(f"📄 {len(pending)} files, {pages} pages, {megabytes:.1f} MB to process")
+    print(f"⏱️  ~{format_duration(pages * per_page / workers)} with {workers} workers "
+          f"({per_page:.2f}s per page per worker, {source})")
+
+
+def ingest(pending: List[Tuple[str, int, float]], manifest: IngestManifest, workers: int, ocr_workers: int,
+           batch_size: int, ocr_profile: Optional[str], upload_dir: str, max_crashes: int = 2):
+    """
+    Process files in a pool of worker processes, which record each outcome in the manifest.
+    
+    A worker that dies takes the pool down with every batch in flight. Files of
+    those batches with no recorded outcome go to a fresh pool, unless they were
+    in flight during max_crashes crashes; they are then recorded as failed and
+    retried on a later run.
+    """
+    logger = logging.getLogger("bulk_ingest")
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    batches.reverse()
+    progress = Progress(len(pending))
+    context = multiprocessing.get_context("spawn")
+    crashes: Dict[str, int] = {}
+    
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_init_worker, initargs=(ocr_workers, manifest.db_path))
+    
+    def settle(batch_id: str, batch: List[Tuple[str, int, float]], submitted_at: float,
+               error: str, crashed: bool = False) -> List[Tuple[str, int, float]]:
+        """Count the recorded files of a batch whose worker failed; return the files without an outcome."""
+        # Copies the worker never got to route or clean up
+        for copy_path in batch_copies(upload_dir, batch_id):
+            os.remove(copy_path)
+        outcomes = []
+        unfinished = []
+        for path, size, mtime in batch:
+            entry = manifest.entry(path)
+            if entry and entry["updated_at"] >= submitted_at and (entry["size"], entry["mtime"]) == (size, mtime):
+                outcomes.append({"path": path, "status": entry["status"], "pages": entry["pages"]})
+            else:
+                unfinished.append((path, size, mtime))
+        retry = []
+        for path, size, mtime in unfinished:
+            crashes[path] = crashes.get(path, 0) + 1
+            if not crashed or crashes[path] >= max_crashes:
+                manifest.record(path, size, mtime, "failed", error=error)
+                outcomes.append({"path": path, "status": "failed", "pages": None})
+            else:
+                retry.append((path, size, mtime))
+        progress.update(outcomes)
+        return retry
+        
+    pool = new_pool()
+    in_flight: Dict[Future, Tuple[str, List[Tuple[str, int, float]], float]] = {}
+    try:
+        while batches or in_flight:
+            # Keep every worker busy with one batch queued behind it
+            while batches and len(in_flight) < workers * 2:
+                batch = batches.pop()
+                batch_id = uuid.uuid4().hex[:12]
+                submitted_at = time.time()
+                future = pool.submit(process_batch, batch_id, batch, ocr_profile)
+                in_flight[future] = (batch_id, batch, submitted_at)
+                
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in finished:
+                batch_id, batch, submitted_at = in_flight.pop(future)
+                try:
+                    progress.update(future.result())
+                except BrokenProcessPool:
+                    broken = True
+                    in_flight[future] = (batch_id, batch, submitted_at)
+                except Exception as e:
+                    settle(batch_id, batch, submitted_at, str(e))
+                    
+            if broken:
+                # A crashed worker takes the pool down with every batch in flight, including
+                # ones other workers were part way through; retry their unfinished files
+                logger.warning("A worker process died; restarting the pool")
+                pool.shutdown(wait=True, cancel_futures=True)
+                for future, (batch_id, batch, submitted_at) in in_flight.items():
+                    if future.done() and not future.cancelled() and not future.exception():
+                        progress.update(future.result())
+                        continue
+                    retry = settle(batch_id, batch, submitted_at, "Worker process died", crashed=True)
+                    if retry:
+                        batches.append(retry)
+                in_flight.clear()
+                pool = new_pool()
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted; run the same command again to resume", file=sys.stderr)
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise SystemExit(130)
+    pool.shutdown()
+    progress.show(final=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify and route a directory tree of documents offline")
+    parser.add_argument("source", help="Directory to ingest (searched recursively)")
+    parser.add_argument("--manifest", default="data/bulk_manifest.db",
+                        help="SQLite manifest of processed files (relative paths are under backend/)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes, each running the whole pipeline")
+    parser.add_argument("--ocr-workers", type=int, default=None,
+                        help="OCR processes per worker (default: CPU cores / workers)")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help="Files handed to a worker at a time; they stream through its pipeline together")
+    parser.add_argument("--ocr-profile", default=None, help="OCR profile for every file (fast, balanced, accurate)")
+    parser.add_argument("--max-attempts", type=int, default=2,
+                        help="Failed files are retried on later runs until they have failed this often")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only count the pages still to process and estimate the time")
+    parser.add_argument("--seconds-per-page", type=float, default=None,
+                        help="Worker time per page for --dry-run estimates (default: measured on previous runs)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if not os.path.isdir(args.source):
+        parser.error(f"Not a directory: {args.source}")
+    workers = max(1, args.workers)
+    ocr_workers = args.ocr_workers or max(1, (os.cpu_count() or 1) // workers)
+    
+    manifest = IngestManifest(args.manifest)
+    file_ops = FileOperations()
+    pending, skipped = select_files(args.source, manifest, args.max_attempts, file_ops)
+    print(f"🔍 {len(pending) + skipped} files found, {skipped} already processed, {len(pending)} to process")
+    
+    if args.dry_run:
+        dry_run(pending, manifest, workers, args.seconds_per_page)
+        return
+    if not pending:
+        return
+        
+    ingest(pending, manifest, workers, ocr_workers, max(1, args.batch_size), args.ocr_profile, file_ops.upload_dir)
+    counts = manifest.counts()
+    print(f"✅ Manifest {manifest.db_path}: {counts.get('done', 0)} done, {counts.get('duplicate', 0)} duplicate, "
+          f"{counts.get('failed', 0)} failed")
+
+
+if __name__ == "__main__":
+    main()
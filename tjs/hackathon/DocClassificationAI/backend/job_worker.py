@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Job queue workers for VA Document Classification System
+
+Workers claim jobs submitted through POST /jobs from the SQLite job queue and
+run each file through the strand pipeline. Start them alongside the API with:
+
+    python job_worker.py --workers 4
+
+The API can also start JOB_WORKERS of them itself, but does so in each of its
+processes: uvicorn --workers 4 with JOB_WORKERS=2 runs 8 job workers.
+"""
+
+import os
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import contextlib
+import logging
+import threading
+import multiprocessing
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.job_queue import JobQueue
+from utils.tracing import Trace, TraceLog, create_trace_log
+
+
+def create_job_queue() -> JobQueue:
+    """Job queue configured from the environment (shared by the API and the workers)."""
+    return JobQueue(
+        db_path=os.getenv("JOB_DB_PATH", "data/jobs.db"),
+        lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    )
+
+
+class JobWorker:
+    """
+    Claims jobs from the queue and processes their files through the strand pipeline.
+    """
+    
+    def __init__(self, worker_id: str, job_queue: JobQueue, poll_interval: float = 1.0,
+                 trace_log: Optional[TraceLog] = None):
+        self.worker_id = worker_id
+        self.job_queue = job_queue
+        # Where the traces of processed files go; None to discard them
+        self.trace_log = trace_log
+        # Seconds to wait before polling again when the queue is empty
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger("job_worker")
+    
+    async def run(self):
+        """Process jobs until cancelled."""
+        self.logger.info(f"Worker {self.worker_id} started")
+        while True:
+            job = await asyncio.to_thread(self.job_queue.claim, self.worker_id)
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.process_job(job)
+    
+    async def process_job(self, job: Dict[str, Any]):
+        """
+        Process the remaining files of a claimed job.
+        
+        Results are recorded file by file, so a job picked up again after a
+        crash only reprocesses the files that never finished.
+        
+        Args:
+            job: Job claimed from the queue
+        """
+        # Imported here so the API module can import this one to start workers
+        from main import pipeline_input
+        
+        job_id = job["id"]
+        self.logger.info(f"Worker {self.worker_id} processing job {job_id} "
+                         f"(attempt {job['attempt']}, {len(job['files'])} files remaining)")
+                         
+        documents = [(job_file["file_index"],
+                      pipeline_input(job_file["file_path"], job_file["filename"], job["ocr_profile"],
+                                     Trace("document", {"filename": job_file["filename"], "job_id": job_id}),
+                                     job_file["file_sha256"]))
+                     for job_file in job["files"]]
+                     
+        work = asyncio.ensure_future(self._process_files(job_id, documents))
+        heartbeat = asyncio.ensure_future(self._keep_lease(job_id))
+        # Once the lease is lost another worker may reclaim the job; stop before
+        # routing or recording anything else so files are never handled twice
+        heartbeat.add_done_callback(lambda lease: work.cancel() if not lease.cancelled() else None)
+        try:
+            if not await work:
+                # Another worker reclaimed the job; its results are the ones that count
+                self.logger.warning(f"Worker {self.worker_id} stopped job {job_id} after losing its lease")
+                return
+            await asyncio.to_thread(self.job_queue.finish, job_id, self.worker_id)
+            self.logger.info(f"Worker {self.worker_id} completed job {job_id}")
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                # The job belongs to whichever worker reclaims it; leave its state alone
+                self.logger.warning(f"Worker {self.worker_id} stopped job {job_id} after losing its lease")
+                return
+            # Shutting down: hand the unfinished files back without counting an attempt
+            work.cancel()
+            await asyncio.to_thread(self.job_queue.release, job_id, self.worker_id)
+            self.logger.info(f"Worker {self.worker_id} released job {job_id}")
+            raise
+        except Exception as e:
+            self.logger.error(f"Job {job_id} failed: {str(e)}")
+            await asyncio.to_thread(self.job_queue.finish, job_id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+    
+    async def _process_files(self, job_id: str, documents: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """
+        Run a job's files through the pipeline, storing each result as it finishes.
+        
+        Returns:
+            False if the job was reclaimed by another worker before every result was stored
+        """
+        from main import strand_pipeline, to_document_result
+        
+        # Files stream through the pipeline stages; closing the stream cancels the rest
+        async with contextlib.aclosing(strand_pipeline.process_stream(documents)) as results:
+            async for file_index, result in results:
+                if self.trace_log:
+                    await asyncio.to_thread(self.trace_log.write, result.get("trace"))
+                file_result = to_document_result(result)
+                recorded = await asyncio.to_thread(self.job_queue.complete_file, job_id, file_index,
+                                                   self.worker_id, file_result.status,
+                                                   file_result.model_dump(), file_result.error or None)
+                if not recorded:
+                    return False
+        return True
+    
+    async def _keep_lease(self, job_id: str):
+        """Renew the job lease well before it expires; returns once the lease is lost."""
+        last_renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(self.job_queue.lease_seconds / 3)
+            try:
+                renewed = await asyncio.to_thread(self.job_queue.heartbeat, job_id, self.worker_id)
+            except Exception as e:
+                # e.g. the database is briefly locked; the lease is still ours until it expires
+                self.logger.warning(f"Worker {self.worker_id} could not renew its lease on job {job_id}: {str(e)}")
+                if time.monotonic() - last_renewed >= self.job_queue.lease_seconds:
+                    self.logger.warning(f"Worker {self.worker_id} lease on job {job_id} expired without renewal")
+                    return
+                continue
+            if not renewed:
+                self.logger.warning(f"Worker {self.worker_id} lost its lease on job {job_id}")
+                return
+            last_renewed = time.monotonic()
+
+
+def run_worker(worker_id: str):
+    """Entry point of a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - %(name)s - %(levelname)s - [{worker_id}] %(message)s"
+    )
+    
+    async def serve():
+        from main import ocr_strand
+        
+        # One trace file per worker slot, so processes never rotate each other's files
+        trace_log = create_trace_log(f"worker-{worker_id.rsplit('-', 1)[-1]}")
+        task = asyncio.ensure_future(JobWorker(worker_id, create_job_queue(), trace_log=trace_log).run())
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            ocr_strand.shutdown()
+            
+    asyncio.run(serve())
+
+
+class JobWorkerPool:
+    """
+    Runs job workers as separate processes and restarts any that die.
+    """
+    
+    def __init__(self, workers: int, check_interval: float = 5.0):
+        self.workers = workers
+        self.check_interval = check_interval
+        self.logger = logging.getLogger("job_worker_pool")
+        # Fresh interpreters: the parent may hold threads and an event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._stopping = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+    
+    def _spawn(self, index: int):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+        # Not daemonic: workers run their own OCR process pools
+        process = self._context.Process(target=run_worker, args=(worker_id,), name=f"job-worker-{index}")
+        process.start()
+        self._processes[index] = process
+        self.logger.info(f"Started job worker {worker_id} (pid {process.pid})")
+    
+    def start(self):
+        """Start the worker processes and the monitor that restarts them."""
+        for index in range(self.workers):
+            self._spawn(index)
+        self._monitor = threading.Thread(target=self._watch, name="job-worker-monitor", daemon=True)
+        self._monitor.start()
+    
+    def _watch(self):
+        while not self._stopping.wait(self.check_interval):
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    self.logger.warning(f"Job worker {index} exited with code {process.exitcode}; restarting")
+                    self._spawn(index)
+    
+    def stop(self, timeout: float = 30.0):
+        """Ask workers to release their jobs and exit, killing any that do not."""
+        self._stopping.set()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process is not None:
+                process.join(max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    process.kill()
+        self.logger.info("Job workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run job queue workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", "2")),
+                        help="Number of worker processes (default: JOB_WORKER_PROCESSES or 2)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    
+    pool = JobWorkerPool(args.workers)
+    pool.start()
+    print(f"🔄 {args.workers} job workers running; press Ctrl+C to stop")
+    
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,28 @@
 import os
 import json
 import logging
-from typing import List, Dict, Any
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from typing import List, Dict, Any, Optional, Set, Tuple
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import asyncio
 
 # Import our custom modules
 from agents.ocr_strand import OCRStrand
 from agents.classification_strand import ClassificationStrand
-from agents.data_extraction_strand import DataExtractionStrand
+from agents.data_extraction_strand import DataExtractionStrand, GeneralDataExtractionStrand
 from agents.confidence_strand import ConfidenceStrand
 from agents.routing_strand import RoutingStrand
 from agents.strand_pipeline import StrandPipeline
-from utils.file_ops import FileOperations
+from utils.file_ops import FileOperations, UploadTooLarge
 from utils.ocr_helpers import OCRHelpers
+from utils.ocr_profiles import OCR_PROFILES
+from utils.metrics import ADMISSION_REJECTIONS, registry as metrics_registry
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.page_source import count_pages
+from utils.tracing import Trace, create_trace_log
+from job_worker import JobWorkerPool, create_job_queue
 
 
 
@@ -92,24 +98,53 @@ app.add_middleware(
 )
 
 # Initialize components
-file_ops = FileOperations()
+# Uploads are streamed to disk in chunks; larger files are refused (0 = no limit).
+# Small images uploaded to /upload-docs stay in memory until routing writes them.
+file_ops = FileOperations(
+    max_upload_mb=float(os.getenv("MAX_UPLOAD_MB", "200")),
+    max_memory_mb=float(os.getenv("UPLOAD_MEMORY_MAX_MB", "1"))
+)
 ocr_helpers = OCRHelpers()
 
 # Initialize strands
 ocr_strand = OCRStrand()
 classification_strand = ClassificationStrand(llm_provider="gemini")  # Using Gemini 2.5 Pro for superior performance
+general_extraction_strand = GeneralDataExtractionStrand()
 data_extraction_strand = DataExtractionStrand()
 confidence_strand = ConfidenceStrand()
 routing_strand = RoutingStrand()
 
+# Durable queue behind the /jobs API; workers are separate processes, normally started
+# with job_worker.py. JOB_WORKERS starts some from the API instead, in every API process
+job_queue = create_job_queue()
+job_workers = JobWorkerPool(int(os.getenv("JOB_WORKERS", "0")))
+
+# Per-document traces, appended to a rotating JSONL file; one per API process, since
+# uvicorn --workers N would otherwise rotate a shared file under each other
+trace_log = create_trace_log(f"api-{os.getpid()}")
+
+# Caps on the uploads processed at once; excess requests wait briefly, then get 429/503
+admission = AdmissionController(
+    max_documents=int(os.getenv("ADMISSION_MAX_DOCUMENTS", "16")),
+    max_pages=int(os.getenv("ADMISSION_MAX_PAGES", "400")),
+    max_waiting=int(os.getenv("ADMISSION_MAX_WAITING", "32")),
+    max_wait_seconds=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30")),
+    retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "15"))
+)
+# Pipeline tasks of /upload-docs/stream requests, kept referenced until they finish
+_stream_tasks: Set[asyncio.Future] = set()
+# Queued jobs accepted by POST /jobs before it answers 429 (0 = unlimited)
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+
 # Create strand pipeline
 strand_pipeline = StrandPipeline([
     ocr_strand,
     classification_strand,
-    data_extraction_strand,  # Extract data after classification
+    general_extraction_strand,  # Runs alongside classification
+    data_extraction_strand,  # Form-specific extraction waits for the document type
     confidence_strand,
     routing_strand
-])
+], stage_workers=StrandPipeline.parse_stage_workers(os.getenv("PIPELINE_STAGE_WORKERS")))
 
 # Pydantic models for responses
 class DocumentResult(BaseModel):
@@ -126,6 +161,7 @@ class DocumentResult(BaseModel):
     new_filename: str = ""
     extracted_data: Dict[str, Any] = {}
     error: str | None = None
+    trace: Dict[str, Any] | None = None
 
 class UploadResponse(BaseModel):
     message: str
@@ -135,6 +171,30 @@ class UploadResponse(BaseModel):
     failed_files: int
     veteran_summary: str | None = None
 
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    total_files: int
+
+class JobFileStatus(BaseModel):
+    filename: str
+    status: str
+    result: DocumentResult | None = None
+    error: str | None = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    ocr_profile: str | None = None
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    attempts: int
+    error: str | None = None
+    total_files: int
+    completed_files: int
+    files: List[JobFileStatus]
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -143,150 +203,523 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "upload_docs": "/upload-docs",
+            "upload_docs_stream": "/upload-docs/stream",
+            "jobs": "/jobs",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
+@app.on_event("startup")
+async def start_workers():
+    """Start the job queue worker processes."""
+    if job_workers.workers:
+        job_workers.start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Stop OCR and job queue worker processes when the server shuts down."""
+    ocr_strand.shutdown()
+    if job_workers.workers:
+        await asyncio.to_thread(job_workers.stop)
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "service": "VA Document Classification System"}
+    """Health check endpoint, including the LLM provider's circuit breaker."""
+    breaker = classification_strand.circuit_breaker.stats()
+    return {
+        "status": "healthy" if breaker["state"] == "closed" else "degraded",
+        "service": "VA Document Classification System",
+        "llm": {
+            "provider": classification_strand.llm_provider,
+            "model": classification_strand.model,
+            "circuit_breaker": breaker
+        }
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Strand, OCR and LLM metrics in the Prometheus text format."""
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def validate_ocr_profile(ocr_profile: Optional[str]):
+    """Reject unknown OCR profile names with a 400."""
+    if ocr_profile and ocr_profile not in OCR_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown OCR profile: {ocr_profile}. "
+                                                    f"Choose from {', '.join(OCR_PROFILES)}")
+
+def admission_error(rejection: AdmissionRejected) -> HTTPException:
+    """HTTP error telling the client to retry later."""
+    return HTTPException(status_code=rejection.status_code, detail=str(rejection),
+                         headers={"Retry-After": str(rejection.retry_after)})
+
+def unsupported_file_result(filename: str) -> DocumentResult:
+    """Result for a file rejected because of its type."""
+    return DocumentResult(
+        filename=filename,
+        document_type="unsupported",
+        confidence=0.0,
+        processing_route="rejected",
+        final_path="",
+        extracted_text_length=0,
+        classification_reasoning="Unsupported file type",
+        confidence_decision="File type not supported",
+        status="failed",
+        error="Unsupported file type"
+    )
+
+def failed_file_result(filename: str, error: str) -> DocumentResult:
+    """Result for a file whose processing raised an error."""
+    return DocumentResult(
+        filename=filename,
+        document_type="unknown",
+        confidence=0.0,
+        processing_route="rejected",
+        final_path="",
+        extracted_text_length=0,
+        classification_reasoning="Processing error",
+        confidence_decision="Document processing failed",
+        status="failed",
+        error=error
+    )
+
+def pipeline_input(file_path: str, filename: str, ocr_profile: Optional[str] = None,
+                   trace: Optional[Trace] = None, file_sha256: Optional[str] = None,
+                   file_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Initial strand pipeline data for a saved upload.
+    
+    Args:
+        file_path: Path of the saved upload
+        filename: Original filename
+        ocr_profile: Optional OCR profile name
+        trace: The document's trace, if already started (a new one is created otherwise)
+        file_sha256: Content hash, if computed while saving (OCR hashes the file otherwise)
+        file_bytes: Contents of an upload kept in memory; file_path is then where
+            it would be saved, and does not exist yet
+            
+    Returns:
+        Pipeline input dictionary
+    """
+    data = {
+        "file_path": file_path,
+        "original_filename": filename,
+        "file_size_mb": (len(file_bytes) / (1024 * 1024) if file_bytes is not None
+                         else file_ops.get_file_size_mb(file_path)),
+        "ocr_profile": ocr_profile,
+        "trace": trace or Trace("document", {"filename": filename})
+    }
+    if file_sha256:
+        data["file_sha256"] = file_sha256
+    if file_bytes is not None:
+        data["file_bytes"] = file_bytes
+    return data
+
+def to_document_result(result: Dict[str, Any], include_trace: bool = False) -> DocumentResult:
+    """
+    Summarize a document's final pipeline data for API responses.
+    
+    Args:
+        result: Pipeline output for one document
+        include_trace: Whether to add the span summary of the document's trace
+        
+    Returns:
+        Processing result for the file
+    """
+    filename = result.get("original_filename", "")
+    try:
+        document_result = DocumentResult(
+            filename=filename,
+            document_type=result.get("document_type", "unknown"),
+            confidence=result.get("confidence", 0.0),
+            processing_route=result.get("processing_route", "rejected"),
+            final_path=result.get("final_path", ""),
+            extracted_text_length=result.get("text_length", 0),
+            classification_reasoning=result.get("classification_reasoning", ""),
+            confidence_decision=result.get("confidence_decision", ""),
+            status="success" if result.get("routing_status") == "success" else "failed",
+            veteran_name=result.get("veteran_name_used", "Unknown"),
+            new_filename=result.get("new_filename", ""),
+            extracted_data=result.get("extracted_data", {}),
+            error=result.get("routing_error") if result.get("routing_status") == "failed" else "",
+            trace=result["trace"].summary() if include_trace and result.get("trace") else None
+        )
+    except Exception as e:
+        logger.error(f"Error processing {filename}: {str(e)}")
+        return failed_file_result(filename, str(e))
+        
+    logger.info(f"Processed {filename}: {document_result.document_type} "
+               f"(confidence: {document_result.confidence})")
+               
+    return document_result
+
+def finish_document(result: Dict[str, Any], include_trace: bool = False) -> DocumentResult:
+    """
+    Log the trace of a document that left the pipeline and summarize its result.
+    
+    An upload still held in memory (because its processing stopped before
+    routing) is saved to the uploads directory first, like any unrouted upload.
+    
+    Args:
+        result: Pipeline output for one document
+        include_trace: Whether to add the span summary of the document's trace
+        
+    Returns:
+        Processing result for the file
+    """
+    try:
+        file_ops.write_in_memory_file(result)
+    except Exception as e:
+        logger.error(f"Could not save {result.get('original_filename')}: {str(e)}")
+    trace_log.write(result.get("trace"))
+    return to_document_result(result, include_trace)
+
+async def save_uploads(files: List[UploadFile], ocr_profile: Optional[str], endpoint: str,
+                       processed_files: List[Optional[DocumentResult]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Save uploaded files and prepare their pipeline input.
+    
+    Rejected and unsaved files get their result in processed_files right away.
+    
+    Args:
+        files: Uploaded files
+        ocr_profile: Optional OCR profile name
+        endpoint: Endpoint name recorded in each document's trace
+        processed_files: Results by upload index, filled in for files that fail here
+        
+    Returns:
+        (upload index, pipeline input) for each saved file
+    """
+    documents = []
+    for index, file in enumerate(files):
+        if not file_ops.validate_file_type(file.filename):
+            logger.warning(f"Skipping unsupported file type: {file.filename}")
+            processed_files[index] = unsupported_file_result(file.filename)
+            continue
+        trace = Trace("document", {"filename": file.filename, "endpoint": endpoint})
+        try:
+            with trace.span("save") as save_span:
+                saved = await file_ops.save_upload(file, keep_in_memory=True)
+                save_span["bytes"] = saved["size_bytes"]
+                save_span["in_memory"] = saved["file_bytes"] is not None
+        except Exception as e:
+            logger.error(f"Error processing {file.filename}: {str(e)}")
+            trace_log.write(trace)
+            processed_files[index] = failed_file_result(file.filename, str(e))
+            continue
+        if saved["file_bytes"] is None:
+            logger.info(f"Saved file: {saved['file_path']} ({saved['size_bytes']} bytes)")
+        documents.append((index, pipeline_input(saved["file_path"], file.filename, ocr_profile, trace,
+                                                saved["sha256"], saved["file_bytes"])))
+    return documents
+
+async def admit_documents(documents: List[Tuple[int, Dict[str, Any]]]) -> Tuple[int, int]:
+    """
+    Wait for admission of saved documents by their page count.
+    
+    Args:
+        documents: (upload index, pipeline input) pairs from save_uploads
+        
+    Returns:
+        Reserved capacity, to hand back with admission.release(*reserved)
+        
+    Raises:
+        HTTPException: 429/503 with Retry-After; the saved files are deleted
+    """
+    # Admission is by page count, read from the saved files before anything is rasterized
+    page_count = 0
+    for _, data in documents:
+        page_count += await asyncio.to_thread(count_pages, data["file_path"], data.get("file_bytes"))
+    try:
+        return await admission.acquire(len(documents), page_count)
+    except AdmissionRejected as e:
+        for _, data in documents:
+            file_ops.cleanup_temp_file(data["file_path"])
+        raise admission_error(e)
+
+def summarize_uploads(processed_files: List[DocumentResult]) -> Tuple[int, int, Optional[str]]:
+    """
+    Count successful and failed files, with a veteran summary for single-file uploads.
+    
+    Args:
+        processed_files: Result of every uploaded file
+        
+    Returns:
+        Tuple of (successful files, failed files, veteran summary or None)
+    """
+    successful_files = sum(1 for result in processed_files if result.status == "success")
+    failed_files = len(processed_files) - successful_files
+    
+    # Generate veteran summary for single document uploads
+    veteran_summary = None
+    if len(processed_files) == 1 and successful_files == 1:
+        successful_result = processed_files[0]
+        if successful_result.extracted_data:
+            veteran_summary = generate_veteran_summary(
+                successful_result.extracted_data, 
+                successful_result.document_type, 
+                successful_result.filename
+            )
+    return successful_files, failed_files, veteran_summary
 
 @app.post("/upload-docs", response_model=UploadResponse)
 async def upload_documents(
-    background_tasks: BackgroundTasks,
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    ocr_profile: Optional[str] = Form(None),
+    include_trace: bool = Form(False)
 ):
     """
     Upload and process multiple documents through the strand pipeline.
     
+    Files stream through the pipeline stages concurrently (see
+    PIPELINE_STAGE_WORKERS); results are returned in upload order. Requests
+    over the admission caps wait for capacity, or are answered with 429/503
+    and Retry-After.
+    
     Args:
         files: List of uploaded files (PDF or images)
+        ocr_profile: Optional OCR profile name ('fast', 'balanced', 'accurate');
+            chosen from file size and OCR_PROFILE when omitted
+        include_trace: Return each document's trace span summary in its result
         
     Returns:
         Processing results for all files
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
+        
+    validate_ocr_profile(ocr_profile)
     
     logger.info(f"Processing {len(files)} uploaded files")
     
-    processed_files = []
-    successful_files = 0
-    failed_files = 0
+    # Turn the request away before saving anything if too many are already waiting
+    try:
+        admission.check()
+    except AdmissionRejected as e:
+        raise admission_error(e)
+        
+    processed_files: List[Optional[DocumentResult]] = [None] * len(files)
     
-    for file in files:
+    # Rejected and unsaved files are answered here; the rest enter the pipeline
+    documents = await save_uploads(files, ocr_profile, "upload-docs", processed_files)
+    
+    if documents:
+        reserved = await admit_documents(documents)
         try:
-            # Validate file type
-            if not file_ops.validate_file_type(file.filename):
-                logger.warning(f"Skipping unsupported file type: {file.filename}")
-                failed_files += 1
-                processed_files.append(DocumentResult(
-                    filename=file.filename,
-                    document_type="unsupported",
-                    confidence=0.0,
-                    processing_route="rejected",
-                    final_path="",
-                    extracted_text_length=0,
-                    classification_reasoning="Unsupported file type",
-                    confidence_decision="File type not supported",
-                    status="failed",
-                    error="Unsupported file type"
-                ))
-                continue
+            # Documents finish in any order; their index puts each result back in upload order
+            async for index, result in strand_pipeline.process_stream(documents):
+                processed_files[index] = await asyncio.to_thread(finish_document, result, include_trace)
+        finally:
+            admission.release(*reserved)
             
-            # Save uploaded file
-            file_path = await file_ops.save_uploaded_file(file)
-            logger.info(f"Saved file: {file_path}")
-            
-            # Prepare initial data for pipeline
-            initial_data = {
-                "file_path": file_path,
-                "original_filename": file.filename,
-                "file_size_mb": file_ops.get_file_size_mb(file_path)
-            }
-            
-            # Process through strand pipeline
-            result = await strand_pipeline.process(initial_data)
-            
-            # Extract relevant information for response
-            document_result = DocumentResult(
-                filename=file.filename,
-                document_type=result.get("document_type", "unknown"),
-                confidence=result.get("confidence", 0.0),
-                processing_route=result.get("processing_route", "rejected"),
-                final_path=result.get("final_path", ""),
-                extracted_text_length=result.get("text_length", 0),
-                classification_reasoning=result.get("classification_reasoning", ""),
-                confidence_decision=result.get("confidence_decision", ""),
-                status="success" if result.get("routing_status") == "success" else "failed",
-                veteran_name=result.get("veteran_name_used", "Unknown"),
-                new_filename=result.get("new_filename", ""),
-                extracted_data=result.get("extracted_data", {}),
-                error=result.get("routing_error") if result.get("routing_status") == "failed" else ""
-            )
+    successful_files, failed_files, veteran_summary = summarize_uploads(processed_files)
+    
+    # Create response
+    response = UploadResponse(
+        message=f"Processed {len(files)} files successfully",
+        processed_files=processed_files,
+        total_files=len(files),
+        successful_files=successful_files,
+        failed_files=failed_files,
+        veteran_summary=veteran_summary
+    )
+
+    logger.info(f"Upload processing completed: {successful_files} successful, {failed_files} failed")
+
+    return response
+
+@app.post("/upload-docs/stream")
+async def upload_documents_stream(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    ocr_profile: Optional[str] = Form(None),
+    include_trace: bool = Form(False)
+):
+    """
+    Upload and process documents like /upload-docs, streaming events as they happen.
+    
+    The response is newline-delimited JSON, or server-sent events when the
+    request accepts text/event-stream. Each event has an 'event' field:
+    
+    - 'accepted': the upload was admitted; total_files and each file's index and filename
+    - 'progress': a strand of one file started, completed or failed, or OCR
+      finished another page (pages_done of page_count)
+    - 'result': a file's DocumentResult, as soon as that file is done
+    - 'done': totals and veteran summary, as in the /upload-docs response
+    - 'error': processing stopped unexpectedly
+    
+    Files are saved and admitted before the stream starts, so validation and
+    admission failures are still plain 4xx/503 responses. Processing carries
+    on if the client disconnects.
+    
+    Args:
+        request: The HTTP request (its Accept header selects the format)
+        files: List of uploaded files (PDF or images)
+        ocr_profile: Optional OCR profile name, as for /upload-docs
+        include_trace: Return each document's trace span summary in its result
+        
+    Returns:
+        Streaming response of processing events
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+        
+    validate_ocr_profile(ocr_profile)
+    
+    logger.info(f"Processing {len(files)} uploaded files (streaming)")
+    
+    try:
+        admission.check()
+    except AdmissionRejected as e:
+        raise admission_error(e)
+        
+    processed_files: List[Optional[DocumentResult]] = [None] * len(files)
+    documents = await save_uploads(files, ocr_profile, "upload-docs/stream", processed_files)
+    reserved = await admit_documents(documents) if documents else (0, 0)
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def emit(event: Dict[str, Any]):
+        # Progress may be reported from worker threads; everything goes through
+        # the event loop so events keep the order they were reported in
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def progress_listener(index: int, filename: str):
+        return lambda progress: emit({"event": "progress", "index": index, "filename": filename, **progress})
+        
+    for index, data in documents:
+        data["progress"] = progress_listener(index, data["original_filename"])
+    
+    async def run():
+        try:
+            async for index, result in strand_pipeline.process_stream(documents):
+                processed_files[index] = await asyncio.to_thread(finish_document, result, include_trace)
+                emit({"event": "result", "index": index, "result": processed_files[index].model_dump()})
+                
+            successful_files, failed_files, veteran_summary = summarize_uploads(processed_files)
+            logger.info(f"Upload processing completed: {successful_files} successful, {failed_files} failed")
+            emit({"event": "done", "total_files": len(files), "successful_files": successful_files,
+                  "failed_files": failed_files, "veteran_summary": veteran_summary})
+        except Exception as e:
+            logger.error(f"Streaming upload failed: {str(e)}")
+            emit({"event": "error", "error": str(e)})
+        finally:
+            admission.release(*reserved)
+            emit(None)
             
-            processed_files.append(document_result)
+    # The pipeline runs as its own task, so a disconnected client does not leave
+    # saved files half-processed; the set keeps a reference until it is done
+    task = asyncio.ensure_future(run())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+    
+    emit({"event": "accepted", "total_files": len(files),
+          "files": [{"index": index, "filename": file.filename} for index, file in enumerate(files)]})
+    # Files rejected or not saved already have their result
+    for index, result in enumerate(processed_files):
+        if result is not None:
+            emit({"event": "result", "index": index, "result": result.model_dump()})
             
-            if document_result.status == "success":
-                successful_files += 1
-            else:
-                failed_files += 1
-                
-            logger.info(f"Processed {file.filename}: {document_result.document_type} "
-                       f"(confidence: {document_result.confidence})")
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+    
+    async def stream():
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            payload = json.dumps(event, default=str)
+            yield f"event: {event['event']}\ndata: {payload}\n\n" if use_sse else payload + "\n"
             
-        except Exception as e:
-            logger.error(f"Error processing {file.filename}: {str(e)}")
-            failed_files += 1
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        # Stop proxies (e.g. nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(
+    files: List[UploadFile] = File(...),
+    ocr_profile: Optional[str] = Form(None)
+):
+    """
+    Queue documents for processing by the job workers and return immediately.
+    
+    Args:
+        files: List of uploaded files (PDF or images)
+        ocr_profile: Optional OCR profile name, as for /upload-docs
+        
+    Returns:
+        Job ID to poll with GET /jobs/{job_id}
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+        
+    validate_ocr_profile(ocr_profile)
+    
+    # Workers pull jobs at their own pace; bound the backlog instead of the work in flight
+    if JOB_MAX_QUEUED:
+        queued = (await asyncio.to_thread(job_queue.counts)).get("queued", 0)
+        if queued >= JOB_MAX_QUEUED:
+            ADMISSION_REJECTIONS.inc(reason="job_queue_full")
+            raise HTTPException(status_code=429, detail=f"{queued} jobs are already queued; retry later",
+                                headers={"Retry-After": str(admission.retry_after)})
+                                
+    job_files = []
+    for file in files:
+        if not file_ops.validate_file_type(file.filename):
+            logger.warning(f"Skipping unsupported file type: {file.filename}")
+            job_files.append({
+                "filename": file.filename,
+                "status": "failed",
+                "result": unsupported_file_result(file.filename).model_dump(),
+                "error": "Unsupported file type"
+            })
+            continue
             
-            processed_files.append(DocumentResult(
-                filename=file.filename,
-                document_type="unknown",
-                confidence=0.0,
-                processing_route="rejected",
-                final_path="",
-                extracted_text_length=0,
-                classification_reasoning="Processing error",
-                confidence_decision="Document processing failed",
-                status="failed",
-                error=str(e)
-            ))
-
-        # (Keep all the existing file processing code above this point)
-    
-        # Generate veteran summary for single document uploads
-        veteran_summary = None
-        if len(files) == 1 and successful_files == 1:
-            successful_result = next((f for f in processed_files if f.status == "success"), None)
-            if successful_result and successful_result.extracted_data:
-                veteran_summary = generate_veteran_summary(
-                    successful_result.extracted_data, 
-                    successful_result.document_type, 
-                    successful_result.filename
-                )
-
-        # Create response
-        response = UploadResponse(
-            message=f"Processed {len(files)} files successfully",
-            processed_files=processed_files,
-            total_files=len(files),
-            successful_files=successful_files,
-            failed_files=failed_files,
-            veteran_summary=veteran_summary
-        )
+        try:
+            saved = await file_ops.save_upload(file)
+        except UploadTooLarge as e:
+            logger.warning(str(e))
+            job_files.append({
+                "filename": file.filename,
+                "status": "failed",
+                "result": failed_file_result(file.filename, str(e)).model_dump(),
+                "error": str(e)
+            })
+            continue
+        job_files.append({"filename": file.filename, "file_path": saved["file_path"],
+                          "file_sha256": saved["sha256"]})
+                          
+    job_id = await asyncio.to_thread(job_queue.submit, job_files, ocr_profile)
+    
+    return JobSubmitResponse(job_id=job_id, status="queued", total_files=len(job_files))
 
-        logger.info(f"Upload processing completed: {successful_files} successful, {failed_files} failed")
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """List the most recent jobs with their progress."""
+    return {
+        "jobs": await asyncio.to_thread(job_queue.list_jobs, limit),
+        "counts": await asyncio.to_thread(job_queue.counts)
+    }
 
-        return response
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """Get a job's status and the status and result of each of its files."""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @app.get("/pipeline/strands")
 async def get_pipeline_strands():
     """Get information about the current strand pipeline."""
     return {
         "strands": strand_pipeline.get_strand_names(),
-        "total_strands": len(strand_pipeline.strands)
+        "total_strands": len(strand_pipeline.strands),
+        "stages": strand_pipeline.get_stage_stats()
     }
 
 @app.get("/stats")
@@ -347,7 +780,15 @@ async def get_processing_stats():
             count_files_recursively(sorted_dir) + 
             count_files_recursively(review_dir) + 
             count_files_recursively(discarded_dir)
-        )
+        ),
+        "ocr_cache": ocr_strand.ocr_cache.stats() if ocr_strand.ocr_cache else None,
+        "classification_cache": (
+            await asyncio.to_thread(classification_strand.classification_cache.stats)
+            if classification_strand.classification_cache else None
+        ),
+        "veteran_registry": await asyncio.to_thread(routing_strand.veteran_registry.stats),
+        "admission": admission.stats(),
+        "jobs": await asyncio.to_thread(job_queue.counts)
     }
     
     return stats
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import backend modules (agents, utils) the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
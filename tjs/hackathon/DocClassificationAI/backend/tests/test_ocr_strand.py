@@ -0,0 +1,39 @@
+import os
+import asyncio
+
+from PIL import Image
+
+import utils.page_source as page_source
+from agents.ocr_strand import OCRStrand
+from utils.ocr_profiles import OCR_PROFILES
+
+
+def test_mixed_pdf_rasterizes_only_the_scanned_page(monkeypatch):
+    """A PDF with one scanned page among text-layer pages OCRs just that page."""
+    rasterized = []
+
+    def convert_from_path(pdf_path, dpi, grayscale, first_page, last_page, output_folder, paths_only):
+        paths = []
+        for page_number in range(first_page, last_page + 1):
+            rasterized.append(page_number)
+            path = os.path.join(output_folder, f"page-{page_number}.png")
+            Image.new("L", (10, 10), 255).save(path)
+            paths.append(path)
+        return paths
+
+    monkeypatch.setattr(page_source, "pdfinfo_from_path", lambda pdf_path: {"Pages": 3})
+    monkeypatch.setattr(page_source, "convert_from_path", convert_from_path)
+
+    strand = OCRStrand(use_cache=False)
+    monkeypatch.setattr(strand.text_layer, "extract_pages", lambda pdf_path: {1: "page one", 3: "page three"})
+
+    async def ocr_page_image(image_path, profile, page_number=1):
+        return {page_number: {"text": f"scanned {os.path.basename(image_path)}", "blank": False}}
+
+    monkeypatch.setattr(strand, "_ocr_page_image", ocr_page_image)
+
+    text, page_methods = asyncio.run(strand._extract_text_from_pdf("mixed.pdf", OCR_PROFILES["balanced"]))
+
+    assert rasterized == [2]
+    assert text == "page one\nscanned page-2.png\npage three"
+    assert page_methods == {"text_layer": [1, 3], "tesseract": [2], "blank": []}
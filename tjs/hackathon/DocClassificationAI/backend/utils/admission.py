@@ -0,0 +1,168 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+from utils.metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTIONS, ADMISSION_WAIT, ADMISSION_WAITING
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted; maps onto an HTTP error with Retry-After.
+    """
+    
+    def __init__(self, status_code: int, reason: str, retry_after: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Caps the documents and pages being processed at once.
+    
+    Each request asks for its document and page count up front. It is admitted
+    straight away if that fits under the caps, otherwise it waits in a bounded
+    FIFO queue. A full queue is rejected immediately (429), and a request that
+    waits too long gives up (503); both tell the client when to retry. Load
+    beyond the caps is turned away instead of being rasterized all at once.
+    """
+    
+    def __init__(self, max_documents: int = 16, max_pages: int = 400, max_waiting: int = 32,
+                 max_wait_seconds: float = 30.0, retry_after: int = 15):
+        # Caps on admitted work (0 disables a cap)
+        self.max_documents = max_documents
+        self.max_pages = max_pages
+        # Requests allowed to wait for capacity, and for how long
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        # Seconds clients are told to wait before retrying
+        self.retry_after = retry_after
+        self.logger = logging.getLogger("admission")
+        
+        self.documents = 0
+        self.pages = 0
+        self._waiters: Deque[Tuple[int, int, asyncio.Future]] = deque()
+        self.admitted_total = 0
+        self.rejected_total: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+    
+    def _clamp(self, documents: int, pages: int) -> Tuple[int, int]:
+        """A request larger than a cap runs alone rather than never being admitted."""
+        if self.max_documents:
+            documents = min(documents, self.max_documents)
+        if self.max_pages:
+            pages = min(pages, self.max_pages)
+        return documents, pages
+    
+    def _fits(self, documents: int, pages: int) -> bool:
+        return ((not self.max_documents or self.documents + documents <= self.max_documents) and
+                (not self.max_pages or self.pages + pages <= self.max_pages))
+    
+    def _take(self, documents: int, pages: int):
+        self.documents += documents
+        self.pages += pages
+        self.admitted_total += 1
+        self._update_gauges()
+    
+    def _wake(self):
+        """Admit waiting requests in arrival order while the oldest one fits."""
+        while self._waiters and self._fits(*self._waiters[0][:2]):
+            documents, pages, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._take(documents, pages)
+            future.set_result(None)
+        self._update_gauges()
+    
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.documents, resource="documents")
+        ADMISSION_IN_FLIGHT.set(self.pages, resource="pages")
+        ADMISSION_WAITING.set(len(self._waiters))
+    
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected_total[reason] += 1
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        if reason == "queue_full":
+            self.logger.warning(f"Rejecting request: {len(self._waiters)} requests already waiting")
+            return AdmissionRejected(429, reason, self.retry_after,
+                                     "Too many requests are waiting to be processed; retry later")
+        self.logger.warning(f"Rejecting request after waiting {self.max_wait_seconds}s for capacity")
+        return AdmissionRejected(503, reason, self.retry_after,
+                                 "Server is at capacity; retry later")
+    
+    def check(self):
+        """
+        Fail fast, before any work is done for a request, if it would be rejected anyway.
+        
+        Raises:
+            AdmissionRejected: If the wait queue is full
+        """
+        if self._waiters and len(self._waiters) >= self.max_waiting:
+            raise self._reject("queue_full")
+    
+    async def acquire(self, documents: int, pages: int) -> Tuple[int, int]:
+        """
+        Wait for capacity for a request.
+        
+        Args:
+            documents: Documents in the request
+            pages: Pages in those documents
+            
+        Returns:
+            The (documents, pages) actually reserved, to pass to release()
+            
+        Raises:
+            AdmissionRejected: If the wait queue is full or capacity did not free up in time
+        """
+        documents, pages = self._clamp(documents, pages)
+        if not self._waiters and self._fits(documents, pages):
+            self._take(documents, pages)
+            ADMISSION_WAIT.observe(0.0)
+            return documents, pages
+            
+        if len(self._waiters) >= self.max_waiting:
+            raise self._reject("queue_full")
+            
+        future = asyncio.get_running_loop().create_future()
+        waiter = (documents, pages, future)
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            # shield: a timeout must not cancel a grant made at the same moment
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait_seconds or None)
+        except BaseException as e:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                future.cancel()
+                # Requests queued behind this one may fit now
+                self._wake()
+            elif future.done() and not future.cancelled():
+                # Admitted just as we gave up; hand the capacity back
+                self.release(documents, pages)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("timeout") from None
+            raise
+            
+        ADMISSION_WAIT.observe(time.perf_counter() - started)
+        return documents, pages
+    
+    def release(self, documents: int, pages: int):
+        """Return capacity reserved by acquire()."""
+        self.documents -= documents
+        self.pages -= pages
+        self._wake()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current load, wait queue depth and rejection counts."""
+        return {
+            "in_flight_documents": self.documents,
+            "in_flight_pages": self.pages,
+            "max_documents": self.max_documents,
+            "max_pages": self.max_pages,
+            "waiting_requests": len(self._waiters),
+            "max_waiting": self.max_waiting,
+            "admitted_total": self.admitted_total,
+            "rejected_total": dict(self.rejected_total)
+        }
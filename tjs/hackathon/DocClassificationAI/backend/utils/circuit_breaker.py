@@ -0,0 +1,126 @@
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+from utils.metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for each state
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing or responding slowly.
+    
+    Closed: calls go through; consecutive failures (errors, timeouts or calls
+    slower than slow_call_seconds) are counted. After failure_threshold of them
+    the breaker opens and calls are refused, so callers take their fallback
+    immediately instead of waiting on a degraded provider. After
+    reset_seconds it turns half-open and lets a single probe call through:
+    success closes the breaker, failure opens it again.
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_seconds: float = 10.0,
+                 reset_seconds: float = 30.0):
+        self.name = name
+        # Consecutive failed or slow calls that open the breaker
+        self.failure_threshold = failure_threshold
+        # Successful calls slower than this still count as failures (0 disables)
+        self.slow_call_seconds = slow_call_seconds
+        # Time spent open before a probe call is allowed
+        self.reset_seconds = reset_seconds
+        self.logger = logging.getLogger("circuit_breaker")
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected_total = 0
+        self.opened_total = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], breaker=name)
+    
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        self.logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], breaker=self.name)
+        CIRCUIT_TRANSITIONS.inc(breaker=self.name, state=state)
+    
+    def allow(self) -> bool:
+        """
+        Ask whether a call may be made now.
+        
+        Returns:
+            True if the call should go ahead; it must then be reported with
+            record_success() or record_failure(). False if the caller should
+            fall back immediately.
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected_total += 1
+            return False
+    
+    def record_success(self, duration: float):
+        """
+        Report a completed call.
+        
+        Args:
+            duration: Call duration in seconds; slow calls count as failures
+        """
+        if self.slow_call_seconds and duration > self.slow_call_seconds:
+            self.record_failure(f"slow call ({duration:.1f}s)")
+            return
+        with self._lock:
+            self._probe_in_flight = False
+            self.consecutive_failures = 0
+            self._transition(CLOSED)
+    
+    def record_failure(self, reason: str = ""):
+        """
+        Report a failed call (error or timeout).
+        
+        Args:
+            reason: Short description for the log
+        """
+        with self._lock:
+            self._probe_in_flight = False
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened_total += 1
+                    self.logger.warning(f"Opening circuit breaker {self.name} after "
+                                        f"{self.consecutive_failures} failures (last: {reason})")
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+    
+    def record_abandoned(self):
+        """Report a call the caller gave up on (e.g. cancelled) without a verdict."""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current state and counters."""
+        with self._lock:
+            probe_in = None
+            if self.state == OPEN:
+                probe_in = round(max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "probe_in": probe_in,
+                "opened_total": self.opened_total,
+                "rejected_total": self.rejected_total
+            }
@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from utils.metrics import CLASSIFICATION_CACHE_EVICTIONS, CLASSIFICATION_CACHE_LOOKUPS
+
+
+class ClassificationCache:
+    """
+    Persistent cache of LLM classification results.
+    
+    Entries are keyed by a fingerprint of the normalized text sent to the LLM
+    together with the prompt and model, so repeat uploads and documents built
+    from the same template skip the provider round-trip. Entries expire after
+    a TTL, and the least recently used ones are evicted beyond max_entries.
+    Stored in SQLite (WAL) so the API and job worker processes share it.
+    """
+    
+    def __init__(self, db_path: str = "data/classification_cache.db", ttl_hours: float = 720,
+                 max_entries: int = 50000):
+        # Resolve relative paths from the backend directory, like the other data paths
+        if not os.path.isabs(db_path):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(backend_dir, db_path)
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.logger = logging.getLogger("classification_cache")
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Counting entries scans the table, so the cap is only checked every
+        # check_interval inserts (and on the first insert of each process)
+        self.check_interval = max(1, max_entries // 100)
+        self._inserts_since_check = self.check_interval
+        
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS classifications (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS classifications_last_used ON classifications (last_used);
+            """)
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; one per operation keeps the cache safe across threads and processes."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Case- and whitespace-insensitive form of a document text."""
+        return re.sub(r"\s+", " ", text).strip().casefold()
+    
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """
+        Build a cache key for a classification request.
+        
+        Args:
+            text: Document text exactly as truncated for the prompt
+            model: Provider and model name
+            prompt_version: Hash of the prompt template
+            
+        Returns:
+            Hex cache key
+        """
+        payload = json.dumps({
+            "text": ClassificationCache.normalize_text(text),
+            "model": model,
+            "prompt": prompt_version
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached classification.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached classification result, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT result, created_at FROM classifications WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and row["created_at"] + self.ttl_seconds < now:
+                conn.execute("DELETE FROM classifications WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                # Refresh recency for LRU eviction
+                conn.execute("UPDATE classifications SET last_used = ? WHERE key = ?", (now, key))
+                
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CLASSIFICATION_CACHE_LOOKUPS.inc(result="miss" if row is None else "hit")
+        return json.loads(row["result"]) if row is not None else None
+    
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        Store a classification, evicting old entries if a periodic check finds
+        the cache over the entry cap.
+        
+        Args:
+            key: Cache key from make_key
+            result: JSON-serialisable classification result
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO classifications (key, result, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now)
+            )
+            if not self.max_entries:
+                return
+            with self._lock:
+                self._inserts_since_check += 1
+                check = self._inserts_since_check >= self.check_interval
+                if check:
+                    self._inserts_since_check = 0
+            if check:
+                count = conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+                if count > self.max_entries:
+                    self._evict(conn, count, now)
+    
+    def _evict(self, conn: sqlite3.Connection, count: int, now: float):
+        """Drop expired entries, then least recently used ones until back under 90% of the cap."""
+        evicted = 0
+        if self.ttl_seconds:
+            evicted += conn.execute("DELETE FROM classifications WHERE created_at < ?",
+                                    (now - self.ttl_seconds,)).rowcount
+        excess = count - evicted - int(self.max_entries * 0.9)
+        if excess > 0:
+            evicted += conn.execute(
+                "DELETE FROM classifications WHERE key IN "
+                "(SELECT key FROM classifications ORDER BY last_used LIMIT ?)",
+                (excess,)
+            ).rowcount
+            
+        with self._lock:
+            self.evictions += evicted
+        CLASSIFICATION_CACHE_EVICTIONS.inc(evicted)
+        self.logger.info(f"Evicted {evicted} classification cache entries")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and cache size."""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "max_entries": self.max_entries
+            }
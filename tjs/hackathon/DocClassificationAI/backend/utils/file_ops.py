@@ -1,19 +1,94 @@
 import os
+import hashlib
 import aiofiles
-from typing import List
+from typing import Any, Dict, List, Optional
 from fastapi import UploadFile
 import uuid
 from datetime import datetime
 
+class UploadTooLarge(ValueError):
+    """
+    Raised when an upload is larger than the configured maximum.
+    """
+    
+    def __init__(self, filename: str, max_bytes: int):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        super().__init__(f"{filename} exceeds the maximum upload size of {max_bytes / (1024 * 1024):g} MB")
+
 class FileOperations:
     """
     Utility class for file operations.
     """
     
-    def __init__(self, upload_dir: str = "backend/data/uploads"):
+    # Images OCR'd straight from memory; PDFs need a file for poppler
+    in_memory_extensions = ('.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp')
+    
+    def __init__(self, upload_dir: str = "backend/data/uploads", max_upload_mb: float = 0,
+                 chunk_size: int = 1024 * 1024, max_memory_mb: float = 0):
         self.upload_dir = upload_dir
+        # Largest upload accepted, in MB (0 = unlimited)
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        # Bytes copied from an upload to disk at a time
+        self.chunk_size = chunk_size
+        # Images up to this size may be kept in memory instead of saved (0 = never)
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
         os.makedirs(upload_dir, exist_ok=True)
     
+    async def save_upload(self, file: UploadFile, keep_in_memory: bool = False) -> Dict[str, Any]:
+        """
+        Stream an uploaded file to disk in chunks, hashing and counting it on the way.
+        
+        Only one chunk is held in memory at a time, and the SHA-256 comes from the
+        same pass, so the pipeline never has to read the file again to hash it.
+        
+        With keep_in_memory, an image no larger than max_memory_bytes is not
+        written at all: its bytes are returned as 'file_bytes', and 'file_path'
+        is the (not yet existing) upload path to write them to if needed. The
+        routing strand then writes them once, to their final location.
+        
+        Args:
+            file: FastAPI UploadFile object
+            keep_in_memory: Allow small images to stay in memory
+            
+        Returns:
+            Dictionary with 'file_path', 'sha256' (hex digest), 'size_bytes' and
+            'file_bytes' (None unless the upload was kept in memory)
+            
+        Raises:
+            UploadTooLarge: The file is over max_upload_bytes; nothing is left on disk
+        """
+        # Reject before copying anything when the size is already known
+        if self.max_upload_bytes and file.size is not None and file.size > self.max_upload_bytes:
+            raise UploadTooLarge(file.filename, self.max_upload_bytes)
+            
+        file_path = self._new_upload_path(file.filename)
+        if (keep_in_memory and self.max_memory_bytes and file.size is not None
+                and file.size <= self.max_memory_bytes
+                and os.path.splitext(file_path)[1].lower() in self.in_memory_extensions):
+            file_bytes = await file.read()
+            return {"file_path": file_path, "sha256": hashlib.sha256(file_bytes).hexdigest(),
+                    "size_bytes": len(file_bytes), "file_bytes": file_bytes}
+                    
+        digest = hashlib.sha256()
+        size_bytes = 0
+        try:
+            async with aiofiles.open(file_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size_bytes += len(chunk)
+                    if self.max_upload_bytes and size_bytes > self.max_upload_bytes:
+                        raise UploadTooLarge(file.filename, self.max_upload_bytes)
+                    digest.update(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            self.cleanup_temp_file(file_path)
+            raise
+            
+        return {"file_path": file_path, "sha256": digest.hexdigest(), "size_bytes": size_bytes, "file_bytes": None}
+    
     async def save_uploaded_file(self, file: UploadFile) -> str:
         """
         Save an uploaded file to disk.
@@ -24,20 +99,16 @@ class FileOperations:
         Returns:
             Path to saved file
         """
-        # Generate unique filename
+        return (await self.save_upload(file))["file_path"]
+    
+    def _new_upload_path(self, original_filename: str) -> str:
+        """Unique path in the upload directory, keeping the original extension."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = str(uuid.uuid4())[:8]
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else ""
+        file_extension = os.path.splitext(original_filename)[1] if original_filename else ""
         
         filename = f"{timestamp}_{unique_id}{file_extension}"
-        file_path = os.path.join(self.upload_dir, filename)
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        return file_path
+        return os.path.join(self.upload_dir, filename)
     
     async def save_multiple_files(self, files: List[UploadFile]) -> List[str]:
         """
@@ -57,6 +128,28 @@ class FileOperations:
         
         return saved_paths
     
+    @staticmethod
+    def write_in_memory_file(data: Dict[str, Any], path: Optional[str] = None) -> bool:
+        """
+        Write a document held in memory ('file_bytes') to disk and drop the bytes.
+        
+        Args:
+            data: Pipeline data of the document
+            path: Where to write it (defaults to its 'file_path')
+            
+        Returns:
+            True if the document was in memory and has been written
+        """
+        file_bytes = data.get("file_bytes")
+        if file_bytes is None:
+            return False
+        path = path or data["file_path"]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(file_bytes)
+        data["file_bytes"] = None
+        return True
+    
     def validate_file_type(self, filename: str) -> bool:
         """
         Validate if file type is supported.
@@ -67,7 +160,7 @@ class FileOperations:
         Returns:
             True if file type is supported, False otherwise
         """
-        supported_extensions = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp']
+        supported_extensions = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp']
         file_extension = os.path.splitext(filename.lower())[1]
         
         return file_extension in supported_extensions
@@ -0,0 +1,164 @@
+import os
+import math
+import difflib
+import logging
+import numpy as np
+from typing import List, Optional, Tuple
+from PIL import Image
+
+
+class ImageTiler:
+    """
+    Splits oversized page images into overlapping horizontal bands so a single
+    huge scan can be OCR'd on several cores, and merges the band texts back.
+    
+    Bands span the full page width, so concatenating them preserves reading
+    order. Cuts are placed on the emptiest pixel rows near the ideal split
+    points (the gaps between text lines). Where no ink-free row exists, the
+    bands overlap on each side of the cut so the line it crosses is read whole
+    at least once, and the duplicate is dropped when merging. Seams cut through
+    empty rows are joined as-is.
+    """
+    
+    def __init__(self, min_pixels: int = 16_000_000, tile_pixels: int = 4_000_000,
+                 max_tiles: int = 8, overlap: int = 64, max_overlap_lines: int = 5):
+        # Images with more pixels than this are tiled (0 disables tiling)
+        self.min_pixels = min_pixels
+        # Target size of each band; the band count is also capped by max_tiles
+        self.tile_pixels = tile_pixels
+        self.max_tiles = max(1, max_tiles)
+        # Rows shared by neighbouring bands on each side of a cut through ink
+        self.overlap = overlap
+        # Lines compared across a seam when removing duplicated text
+        self.max_overlap_lines = max_overlap_lines
+        self.logger = logging.getLogger("image_tiles")
+    
+    def tile_count(self, image_path: str, max_pixels: Optional[int] = None) -> int:
+        """
+        Decide how many bands an image should be split into.
+        
+        Args:
+            image_path: Path to the page image, or an open image file (only its header is read)
+            max_pixels: Size the OCR profile downscales to, if any
+            
+        Returns:
+            Number of bands, 1 if the image should be OCR'd whole
+        """
+        if not self.min_pixels:
+            return 1
+            
+        with Image.open(image_path) as image:
+            width, height = image.size
+            
+        pixels = width * height
+        if max_pixels:
+            # The profile shrinks the image before OCR; tile what Tesseract will see
+            pixels = min(pixels, max_pixels)
+        if pixels <= self.min_pixels:
+            return 1
+            
+        # Every band must stay comfortably taller than the overlap around it
+        max_by_height = max(1, height // (self.overlap * 8))
+        return max(1, min(self.max_tiles, max_by_height, math.ceil(pixels / self.tile_pixels)))
+    
+    def split(self, image_path: str, tiles: int, output_dir: str) -> Tuple[List[str], List[bool]]:
+        """
+        Write the bands of an image to disk.
+        
+        Args:
+            image_path: Path to the page image
+            tiles: Number of bands
+            output_dir: Directory for the band images
+            
+        Returns:
+            Paths of the band images, top to bottom, and for each seam between
+            them whether the bands overlap (the cut crosses ink)
+        """
+        with Image.open(image_path) as image:
+            image.load()
+            cuts = self._find_cuts(image, tiles)
+            width, height = image.size
+            
+            tile_paths = []
+            bounds = [(0, True)] + cuts + [(height, True)]
+            for index in range(len(bounds) - 1):
+                (start, start_clean), (end, end_clean) = bounds[index], bounds[index + 1]
+                top = start if start_clean else max(0, start - self.overlap)
+                bottom = end if end_clean else min(height, end + self.overlap)
+                tile_path = os.path.join(output_dir, f"tile_{index + 1:03d}.png")
+                tile = image.crop((0, top, width, bottom))
+                if tile.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+                    tile = tile.convert("RGB")
+                tile.save(tile_path)
+                tile_paths.append(tile_path)
+                
+        self.logger.info(f"Split {width}x{height} image into {len(tile_paths)} bands "
+                         f"at rows {[row for row, _ in cuts]}")
+        return tile_paths, [not clean for _, clean in cuts]
+    
+    def _find_cuts(self, image: Image.Image, tiles: int) -> List[Tuple[int, bool]]:
+        """Pick cut rows with the least ink near evenly spaced split points, and whether each is ink-free."""
+        gray = np.asarray(image.convert("L"), dtype=np.uint8)
+        height = gray.shape[0]
+        # Ink per row, relative to the page background
+        background = float(np.median(gray))
+        row_ink = (gray < min(background - 60, 160)).sum(axis=1)
+        
+        band_height = height / tiles
+        search = max(1, int(band_height / 4))
+        cuts = []
+        for index in range(1, tiles):
+            ideal = int(index * band_height)
+            low, high = max(1, ideal - search), min(height - 1, ideal + search)
+            window = row_ink[low:high]
+            # Prefer the emptiest row, and among equally empty rows the one nearest the ideal cut
+            distance = np.abs(np.arange(low, high) - ideal)
+            row = int(low + np.lexsort((distance, window))[0])
+            cuts.append((row, bool(row_ink[row] == 0)))
+            
+        return cuts
+    
+    def merge(self, texts: List[str], overlaps: List[bool]) -> str:
+        """
+        Join band texts top to bottom, dropping lines repeated across overlapping seams.
+        
+        Seams cut through empty rows are never deduplicated: their bands share no
+        pixels, so similar neighbouring lines (e.g. two dates) are distinct text.
+        
+        Args:
+            texts: OCR text of each band, in order
+            overlaps: For each seam, whether its bands overlap (as returned by split)
+            
+        Returns:
+            Text of the whole page
+        """
+        merged: List[str] = []
+        for index, text in enumerate(texts):
+            lines = text.rstrip().splitlines()
+            skip = self._seam_overlap(merged, lines) if index and overlaps[index - 1] else 0
+            merged.extend(lines[skip:])
+            
+        return "\n".join(merged) + "\n" if merged else ""
+    
+    def _seam_overlap(self, previous: List[str], lines: List[str]) -> int:
+        """Number of leading lines of a band that repeat the end of the text so far."""
+        tail = [(i, self._normalize(line)) for i, line in enumerate(previous) if line.strip()]
+        head = [(i, self._normalize(line)) for i, line in enumerate(lines) if line.strip()]
+        tail = tail[-self.max_overlap_lines:]
+        head = head[:self.max_overlap_lines]
+        
+        for count in range(min(len(tail), len(head)), 0, -1):
+            pairs = zip(tail[-count:], head[:count])
+            if all(self._same_line(a, b) for (_, a), (_, b) in pairs):
+                # Skip through the last duplicated line of the new band
+                return head[count - 1][0] + 1
+        return 0
+    
+    @staticmethod
+    def _normalize(line: str) -> str:
+        return " ".join(line.split()).lower()
+    
+    @staticmethod
+    def _same_line(a: str, b: str) -> bool:
+        """OCR of the same line in two bands may differ by a character or two."""
+        return a == b or difflib.SequenceMatcher(None, a, b).ratio() >= 0.9
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class IngestManifest:
+    """
+    Record of the files processed by a bulk ingestion run, backed by SQLite.
+    
+    Each source file has one row with its size and modification time when it
+    was processed, its content hash, status and result. A file is skipped on
+    later runs once it is 'done' and unchanged on disk, so an interrupted run
+    resumes where it stopped.
+    """
+    
+    def __init__(self, db_path: str = "data/bulk_manifest.db"):
+        # Resolve relative paths from the backend directory, like the other data paths
+        if not os.path.isabs(db_path):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(backend_dir, db_path)
+        self.db_path = db_path
+        self.logger = logging.getLogger("ingest_manifest")
+        
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    sha256 TEXT,
+                    status TEXT NOT NULL,
+                    pages INTEGER,
+                    duration_seconds REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+            """)
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; one per operation keeps the manifest safe across threads and processes."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    def entries(self) -> Dict[str, Tuple[int, float, str, int]]:
+        """
+        Load the state of every recorded file, for deciding what to (re)process.
+        
+        Returns:
+            Mapping of path to (size, mtime, status, attempts)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT path, size, mtime, status, attempts FROM files").fetchall()
+        return {row["path"]: (row["size"], row["mtime"], row["status"], row["attempts"]) for row in rows}
+    
+    def record(self, path: str, size: int, mtime: float, status: str, sha256: Optional[str] = None,
+               pages: Optional[int] = None, duration_seconds: Optional[float] = None,
+               result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """
+        Record the outcome of processing one file.
+        
+        Args:
+            path: Absolute source path
+            size: File size in bytes when it was processed
+            mtime: Modification time when it was processed
+            status: 'done', 'failed' or 'duplicate'
+            sha256: Content hash; if None, a hash already recorded for the unchanged file is kept
+            pages: Page count
+            duration_seconds: Time spent processing the file
+            result: Processing result
+            error: Error message for failed files
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO files (path, size, mtime, sha256, status, pages, duration_seconds, attempts, "
+                "result, error, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+                "sha256 = CASE WHEN excluded.sha256 IS NOT NULL THEN excluded.sha256 "
+                "WHEN size = excluded.size AND mtime = excluded.mtime THEN sha256 END, "
+                "status = excluded.status, pages = excluded.pages, "
+                "duration_seconds = excluded.duration_seconds, attempts = attempts + 1, "
+                "result = excluded.result, error = excluded.error, updated_at = excluded.updated_at",
+                (path, size, mtime, sha256, status, pages, duration_seconds,
+                 json.dumps(result) if result is not None else None, error, time.time())
+            )
+    
+    def entry(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the recorded state of one file.
+        
+        Returns:
+            Dictionary with size, mtime, sha256, status, pages, result, error and
+            updated_at, or None if the file was never recorded
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT size, mtime, sha256, status, pages, result, error, updated_at FROM files WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["result"] = json.loads(row["result"]) if row["result"] else None
+        return entry
+    
+    def set_durations(self, durations: Dict[str, float]):
+        """Store the time spent processing already recorded files, keyed by path."""
+        with self._connect() as conn:
+            conn.executemany("UPDATE files SET duration_seconds = ? WHERE path = ?",
+                             [(seconds, path) for path, seconds in durations.items()])
+    
+    def find_by_hash(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a processed file with the given content.
+        
+        Args:
+            sha256: Content hash
+            
+        Returns:
+            Path and result of a 'done' file with this hash, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT path, result FROM files WHERE sha256 = ? AND status = 'done' LIMIT 1", (sha256,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"path": row["path"], "result": json.loads(row["result"]) if row["result"] else None}
+    
+    def seconds_per_page(self) -> Optional[float]:
+        """Average worker time per page of recorded files, if any were timed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT SUM(duration_seconds) AS seconds, SUM(pages) AS pages FROM files "
+                "WHERE status = 'done' AND duration_seconds IS NOT NULL AND pages > 0"
+            ).fetchone()
+        return row["seconds"] / row["pages"] if row["pages"] else None
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of files in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM files GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class JobQueue:
+    """
+    Durable job queue backed by a local SQLite database.
+    
+    A job is a batch of saved uploads. Workers claim a job by taking a lease on
+    it and renew the lease while they work; if a worker dies its lease expires
+    and the job is handed to another worker, which only reprocesses the files
+    that have no recorded result yet.
+    """
+    
+    def __init__(self, db_path: str = "data/jobs.db", lease_seconds: float = 300.0,
+                 max_attempts: int = 3):
+        # Resolve relative paths from the backend directory, like the other data paths
+        if not os.path.isabs(db_path):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(backend_dir, db_path)
+        self.db_path = db_path
+        # How long a claimed job stays with its worker without a heartbeat
+        self.lease_seconds = lease_seconds
+        # Claims after which a job that keeps killing its workers is failed
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger("job_queue")
+        
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            # WAL lets the API read job status while workers write results
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    ocr_profile TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL REFERENCES jobs (id),
+                    file_index INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_path TEXT,
+                    file_sha256 TEXT,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, file_index)
+                );
+            """)
+            # Queues created before uploads were hashed while saving lack the column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(job_files)")}
+            if "file_sha256" not in columns:
+                conn.execute("ALTER TABLE job_files ADD COLUMN file_sha256 TEXT")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; one per operation keeps the queue safe across threads and processes."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def submit(self, files: List[Dict[str, Any]], ocr_profile: Optional[str] = None) -> str:
+        """
+        Enqueue a batch of saved files as one job.
+        
+        Args:
+            files: Dictionaries with 'filename', 'file_path' and optionally 'file_sha256';
+                entries may also carry a final 'status' ('failed'), 'result' and 'error'
+                (e.g. rejected file types)
+            ocr_profile: Optional OCR profile name for every file in the job
+            
+        Returns:
+            ID of the new job
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO jobs (id, status, ocr_profile, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, ocr_profile, now, now)
+            )
+            conn.executemany(
+                "INSERT INTO job_files (job_id, file_index, filename, file_path, file_sha256, status, result, "
+                "error, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, index, f["filename"], f.get("file_path"), f.get("file_sha256"), f.get("status", "queued"),
+                  json.dumps(f["result"]) if f.get("result") is not None else None, f.get("error"), now)
+                 for index, f in enumerate(files)]
+            )
+            conn.execute("COMMIT")
+            
+        self.logger.info(f"Queued job {job_id} with {len(files)} files")
+        return job_id
+    
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued job, or one whose worker stopped renewing its lease.
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+            
+        Returns:
+            Job dictionary with the files still to process, or None if there is no work
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # IMMEDIATE takes the write lock up front so two workers cannot claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_expires_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                    
+                if row["status"] == "running":
+                    self.logger.warning(f"Lease of job {row['id']} held by {row['worker_id']} expired; reclaiming")
+                    
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                        (f"Abandoned after {row['attempts']} attempts", now, now, row["id"])
+                    )
+                    conn.execute(
+                        "UPDATE job_files SET status = 'failed', error = 'Job abandoned', updated_at = ? "
+                        "WHERE job_id = ? AND status NOT IN ('success', 'failed')",
+                        (now, row["id"])
+                    )
+                    self.logger.error(f"Job {row['id']} failed after {row['attempts']} attempts")
+                    continue
+                    
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker_id = ?, lease_expires_at = ?, "
+                    "attempts = attempts + 1, started_at = COALESCE(started_at, ?), updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, now, now, row["id"])
+                )
+                files = conn.execute(
+                    "SELECT file_index, filename, file_path, file_sha256 FROM job_files "
+                    "WHERE job_id = ? AND status NOT IN ('success', 'failed') ORDER BY file_index",
+                    (row["id"],)
+                ).fetchall()
+                conn.execute("COMMIT")
+                
+                return {
+                    "id": row["id"],
+                    "ocr_profile": row["ocr_profile"],
+                    "attempt": row["attempts"] + 1,
+                    "files": [dict(f) for f in files]
+                }
+    
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend a worker's lease on a job.
+        
+        Returns:
+            False if the job is no longer held by this worker
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def release(self, job_id: str, worker_id: str):
+        """Return a job to the queue without counting the attempt (e.g. on worker shutdown)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires_at = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now, job_id, worker_id)
+            )
+    
+    def complete_file(self, job_id: str, file_index: int, worker_id: str, status: str,
+                      result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+        """
+        Record the outcome of one file of a job.
+        
+        Args:
+            job_id: Job ID
+            file_index: Position of the file in the job
+            worker_id: Worker that processed the file; it must still hold the job
+            status: 'success' or 'failed'
+            result: Processing result to return to clients
+            error: Error message for failed files
+            
+        Returns:
+            False if the job is no longer held by this worker and nothing was recorded
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE job_files SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND file_index = ? "
+                "AND EXISTS (SELECT 1 FROM jobs WHERE id = ? AND worker_id = ?)",
+                (status, json.dumps(result) if result is not None else None, error,
+                 time.time(), job_id, file_index, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def finish(self, job_id: str, worker_id: str, error: Optional[str] = None):
+        """Mark a job completed (or failed, if error is given) and release its lease."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ?",
+                ("failed" if error else "completed", error, now, now, job_id, worker_id)
+            )
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job with the status and result of each of its files.
+        
+        Returns:
+            Job dictionary, or None if no job has this ID
+        """
+        with self._connect() as conn:
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = conn.execute(
+                "SELECT * FROM job_files WHERE job_id = ? ORDER BY file_index", (job_id,)
+            ).fetchall()
+            
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "ocr_profile": job["ocr_profile"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "attempts": job["attempts"],
+            "error": job["error"],
+            "total_files": len(files),
+            "completed_files": sum(1 for f in files if f["status"] in ("success", "failed")),
+            "files": [{
+                "filename": f["filename"],
+                "status": f["status"],
+                "result": json.loads(f["result"]) if f["result"] else None,
+                "error": f["error"]
+            } for f in files]
+        }
+    
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs with their file progress, newest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT j.id, j.status, j.created_at, j.finished_at, COUNT(f.file_index) AS total_files, "
+                "SUM(f.status IN ('success', 'failed')) AS completed_files "
+                "FROM jobs j LEFT JOIN job_files f ON f.job_id = j.id "
+                "GROUP BY j.id ORDER BY j.created_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+            
+        return [{
+            "job_id": row["id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"],
+            "total_files": row["total_files"],
+            "completed_files": row["completed_files"] or 0
+        } for row in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
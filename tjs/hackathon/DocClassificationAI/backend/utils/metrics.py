@@ -0,0 +1,280 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans a fast strand up to OCR of a long scanned PDF
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric(ABC):
+    """
+    Base for metrics with a fixed set of label names.
+    """
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+    
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        pass
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, one series per combination of label values.
+    """
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Add amount (default 1) to the series selected by labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Current value of one series."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, such as a queue depth.
+    """
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def set(self, value: float, **labels: str):
+        """Set the series selected by labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (e.g. latencies) in cumulative buckets.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per series: non-cumulative bucket counts, sum, count
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+    
+    def observe(self, value: float, **labels: str):
+        """Record one observation in the series selected by labels."""
+        key = self._key(labels)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * len(self.buckets), [0.0, 0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(counts), list(totals)) for key, (counts, totals) in self._series.items())
+            
+        lines = []
+        for key, counts, (total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+    
+    Metrics are per process: the API and each job worker process keep their own.
+    """
+    
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different definition")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create (or return the already registered) counter."""
+        return self._register(Counter(self._full_name(name), documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create (or return the already registered) gauge."""
+        return self._register(Gauge(self._full_name(name), documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Create (or return the already registered) histogram."""
+        return self._register(Histogram(self._full_name(name), documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """
+        Render every registered metric.
+        
+        Returns:
+            Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def start_http_server(port: int, metrics_registry: Optional[MetricsRegistry] = None,
+                      host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a background thread, for processes without the API.
+    
+    Args:
+        port: Port to listen on
+        metrics_registry: Registry to render (defaults to the shared one)
+        host: Interface to bind
+        
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    metrics_registry = metrics_registry or registry
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics_registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+            
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+registry = MetricsRegistry(namespace="docclass")
+
+STRAND_DURATION = registry.histogram(
+    "strand_duration_seconds", "Time spent in Strand.execute", ("strand",))
+STRAND_RUNS = registry.counter(
+    "strand_runs_total", "Strand executions by outcome", ("strand", "status"))
+PIPELINE_DURATION = registry.histogram(
+    "pipeline_duration_seconds", "Time for one document to pass through the whole pipeline")
+PIPELINE_DOCUMENTS = registry.counter(
+    "pipeline_documents_total", "Documents that left the pipeline by outcome", ("status",))
+OCR_PAGES = registry.counter(
+    "ocr_pages_total", "Pages processed by how their text was obtained", ("method",))
+OCR_CHARACTERS = registry.counter(
+    "ocr_characters_total", "Characters of text extracted from documents")
+OCR_DURATION = registry.histogram(
+    "ocr_document_duration_seconds", "Time to extract the full text of a document (cache misses)")
+LLM_REQUESTS = registry.counter(
+    "llm_requests_total", "LLM classification requests by provider and outcome", ("provider", "status"))
+LLM_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "LLM classification request latency", ("provider",))
+LLM_FALLBACKS = registry.counter(
+    "llm_fallbacks_total", "Classifications that fell back to keyword matching", ("provider",))
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Documents and pages admitted to /upload-docs and not yet finished", ("resource",))
+ADMISSION_WAITING = registry.gauge(
+    "admission_waiting_requests", "Upload requests waiting for capacity")
+ADMISSION_WAIT = registry.histogram(
+    "admission_wait_seconds", "Time admitted upload requests waited for capacity")
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total", "Requests turned away by admission control", ("reason",))
+CLASSIFICATION_CACHE_LOOKUPS = registry.counter(
+    "classification_cache_lookups_total", "Classification cache lookups by result", ("result",))
+CLASSIFICATION_CACHE_EVICTIONS = registry.counter(
+    "classification_cache_evictions_total", "Classification cache entries evicted (expired or least recently used)")
+CIRCUIT_STATE = registry.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("breaker",))
+CIRCUIT_TRANSITIONS = registry.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes by new state", ("breaker", "state"))
+WATCH_FILES = registry.counter(
+    "watch_files_total", "Files picked up from the watch folder by outcome", ("outcome",))
+WATCH_FILES_PENDING = registry.gauge(
+    "watch_files_pending", "Watch folder files not yet finished, by state", ("state",))
+WATCH_LAG = registry.histogram(
+    "watch_lag_seconds", "Time from a file's last write in the watch folder to the end of its processing")
@@ -0,0 +1,182 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+
+class OCRCache:
+    """
+    Content-addressed, size-capped disk cache of OCR results.
+    
+    Entries are keyed by the SHA-256 of the uploaded bytes plus the OCR
+    configuration, stored as one JSON file each, and evicted least recently
+    used first (file mtime is refreshed on every hit) once the cache exceeds
+    its size cap.
+    """
+    
+    def __init__(self, cache_dir: str = "data/ocr_cache", max_size_mb: float = 500):
+        # Use relative path from the backend directory
+        if not os.path.isabs(cache_dir):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            cache_dir = os.path.join(backend_dir, cache_dir)
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.logger = logging.getLogger("ocr_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size_bytes = self._scan_size()
+    
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Compute the SHA-256 of a file without loading it into memory.
+        
+        Args:
+            file_path: Path to the file
+            chunk_size: Bytes read per iteration
+            
+        Returns:
+            Hex digest of the file contents
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def make_key(content_hash: str, ocr_config: Dict[str, Any]) -> str:
+        """
+        Build a cache key from the file hash and the OCR configuration.
+        
+        Args:
+            content_hash: SHA-256 of the uploaded bytes
+            ocr_config: Settings that affect OCR output (DPI, Tesseract version, flags)
+            
+        Returns:
+            Hex cache key
+        """
+        config_json = json.dumps(ocr_config, sort_keys=True)
+        return hashlib.sha256(f"{content_hash}:{config_json}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached OCR result.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached result dictionary, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                result = json.load(f)
+            # Refresh recency for LRU eviction
+            os.utime(entry_path, None)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+            
+        with self._lock:
+            self.hits += 1
+        return result
+    
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        Store an OCR result and evict old entries if over the size cap.
+        
+        Args:
+            key: Cache key from make_key
+            result: JSON-serialisable OCR result
+        """
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        
+        # Write atomically so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+            previous_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            os.replace(temp_path, entry_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+            
+        with self._lock:
+            self._size_bytes += os.path.getsize(entry_path) - previous_size
+            over_cap = self._size_bytes > self.max_size_bytes
+            
+        if over_cap:
+            self._evict()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_mb": round(self._size_bytes / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_size_bytes / (1024 * 1024), 2)
+            }
+    
+    def _entry_path(self, key: str) -> str:
+        """Shard entries into subdirectories by key prefix."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+    
+    def _list_entries(self):
+        """List (mtime, size, path) for every cache entry."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def _scan_size(self) -> int:
+        """Total size of existing entries on disk."""
+        return sum(size for _, size, _ in self._list_entries())
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache is back under 90% of its cap."""
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_size_bytes * 0.9)
+        evicted = 0
+        
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except FileNotFoundError:
+                # Another worker evicted it first
+                total -= size
+                
+        with self._lock:
+            self._size_bytes = total
+            self.evictions += evicted
+            
+        self.logger.info(f"Evicted {evicted} OCR cache entries ({total / (1024 * 1024):.1f} MB remaining)")
@@ -0,0 +1,309 @@
+import io
+import os
+import math
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, Iterable, List, Optional, Tuple
+import pytesseract
+from PIL import Image
+from utils.blank_page import BlankPageDetector
+from utils.ocr_profiles import needs_preprocessing, preprocess_image
+from utils.tracing import current_trace
+
+# Called with (page_number, completed_pages, total_pages) after each page finishes
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def _init_worker(tesseract_cmd: str):
+    """Point pytesseract in a worker process at the parent's Tesseract binary."""
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _decode_page(page: Any) -> Any:
+    """Open pages handed over as encoded image bytes (in-memory uploads); others pass through."""
+    if isinstance(page, bytes):
+        return Image.open(io.BytesIO(page))
+    return page
+
+
+def _prepare_page(page: Any, options: Dict[str, Any]) -> Any:
+    """Apply the OCR profile's preprocessing ('profile' in options), if it has any."""
+    profile = options.get("profile")
+    if not profile or not needs_preprocessing(profile):
+        return page
+        
+    image = Image.open(page) if isinstance(page, str) else page
+    return preprocess_image(image, profile)
+
+
+def _tesseract_config(options: Dict[str, Any]) -> str:
+    """Extra Tesseract command-line flags from the OCR profile."""
+    return (options.get("profile") or {}).get("tesseract_config", "")
+
+
+def _is_blank(page: Any, options: Dict[str, Any]) -> bool:
+    """Check a page against the blank-page threshold in options ('blank_ink_ratio', 0 disables)."""
+    blank_ink_ratio = options.get("blank_ink_ratio", 0)
+    if not blank_ink_ratio:
+        return False
+        
+    detector = BlankPageDetector(max_ink_ratio=blank_ink_ratio)
+    if isinstance(page, str):
+        with Image.open(page) as image:
+            return detector.is_blank(image)
+    return detector.is_blank(page)
+
+
+def ocr_page(page: Any, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    OCR a single page inside a worker process.
+
+    Module-level so it can be pickled by the process pool.
+
+    Args:
+        page: PIL image of the page, path to a page image on disk, or the
+            encoded bytes of an image file
+        options: Per-document OCR options ('profile': settings from OCR_PROFILES,
+            'blank_ink_ratio': skip threshold, 0 disables)
+            
+    Returns:
+        Dictionary with the page 'text' and whether it was skipped as 'blank'
+    """
+    page = _prepare_page(_decode_page(page), options)
+    if _is_blank(page, options):
+        return {"text": "", "blank": True}
+        
+    return {"text": pytesseract.image_to_string(page, config=_tesseract_config(options)), "blank": False}
+
+
+def _run_tesseract_batch(pages: List[Any], config: str = "") -> Optional[List[str]]:
+    """
+    OCR several pages with a single Tesseract process.
+    
+    Tesseract accepts a text file listing one image per line and separates the
+    pages of its text output with form feeds, so the process spawn and language
+    model load are paid once per batch instead of once per page.
+    
+    Args:
+        pages: Page images or image paths
+        config: Extra Tesseract command-line flags
+        
+    Returns:
+        Page texts in input order, or None if the output could not be split
+    """
+    temp_dir = tempfile.mkdtemp(prefix="ocr_batch_")
+    try:
+        page_paths = []
+        for i, page in enumerate(pages):
+            if isinstance(page, str):
+                page_paths.append(os.path.abspath(page))
+            else:
+                page_path = os.path.join(temp_dir, f"page_{i}.png")
+                page.save(page_path)
+                page_paths.append(page_path)
+                
+        list_path = os.path.join(temp_dir, "pages.txt")
+        with open(list_path, "w") as f:
+            f.write("\n".join(page_paths) + "\n")
+            
+        result = subprocess.run(
+            [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout",
+             "-c", "page_separator=\f", *config.split()],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            return None
+            
+        texts = result.stdout.decode("utf-8", errors="ignore").split("\f")
+        # The separator follows every page, leaving an empty tail
+        if len(texts) == len(pages) + 1 and not texts[-1].strip():
+            texts = texts[:-1]
+        if len(texts) != len(pages):
+            return None
+        return texts
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def ocr_page_batch(pages: List[Any], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    OCR a batch of pages inside a worker process.
+    
+    Blank pages are filtered out first; the rest go through one Tesseract
+    invocation, falling back to per-page calls if the batch output is unusable.
+    
+    Args:
+        pages: Page images, image paths or encoded image bytes
+        options: Per-document OCR options, as for ocr_page
+        
+    Returns:
+        Page results in input order
+    """
+    pages = [_prepare_page(_decode_page(page), options) for page in pages]
+    config = _tesseract_config(options)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(pages)
+    to_ocr = []
+    for i, page in enumerate(pages):
+        if _is_blank(page, options):
+            results[i] = {"text": "", "blank": True}
+        else:
+            to_ocr.append(i)
+            
+    texts = None
+    if len(to_ocr) > 1:
+        texts = _run_tesseract_batch([pages[i] for i in to_ocr], config)
+    if texts is None:
+        texts = [pytesseract.image_to_string(pages[i], config=config) for i in to_ocr]
+        
+    for i, text in zip(to_ocr, texts):
+        results[i] = {"text": text, "blank": False}
+        
+    return results
+
+
+def _take(page_iter: Iterator[Tuple[int, Any]], count: int) -> List[Tuple[int, Any]]:
+    """Pull up to count items from an iterator."""
+    items = []
+    for item in page_iter:
+        items.append(item)
+        if len(items) >= count:
+            break
+    return items
+
+
+class ParallelOCREngine:
+    """
+    Page-parallel OCR engine backed by a bounded process pool.
+    Pages are OCR'd concurrently and returned keyed by page number.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 batch_size: int = 1):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Batches handed to the pool but not yet finished; bounds memory and temp files
+        self.max_in_flight = max_in_flight or self.max_workers * 2
+        # Pages sent to one Tesseract invocation (1 = one process per page)
+        self.batch_size = max(1, batch_size)
+        self.logger = logging.getLogger("ocr_engine")
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(pytesseract.pytesseract.tesseract_cmd,)
+            )
+            self.logger.info(f"Started OCR process pool with {self.max_workers} workers")
+        return self._executor
+    
+    def _effective_batch_size(self, total: Optional[int]) -> int:
+        """Shrink batches for short documents so every worker still gets pages."""
+        if not total:
+            return self.batch_size
+        return max(1, min(self.batch_size, math.ceil(total / self.max_workers)))
+    
+    async def ocr_pages(self, pages: Iterable[Tuple[int, Any]],
+                        total: Optional[int] = None,
+                        progress_callback: Optional[ProgressCallback] = None,
+                        release_page: Optional[Callable[[Any], None]] = None,
+                        page_callback: Optional[Callable[[int, str], None]] = None,
+                        options: Optional[Dict[str, Any]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        OCR a stream of pages in parallel.
+
+        Pages are pulled from the iterable only as worker slots free up, so a lazy
+        page source is never more than max_in_flight batches ahead of the OCR.
+        
+        Args:
+            pages: Iterable of (page_number, page) pairs; page is an image, image path
+                or encoded image bytes
+            total: Total number of pages, if known, for progress reporting
+            progress_callback: Optional callback invoked as each page completes
+            release_page: Optional callback to free a page once its text is captured
+            page_callback: Optional callback receiving (page_number, text) as pages finish
+            options: OCR options passed through to the workers
+            
+        Returns:
+            Dictionary mapping page numbers to page results ('text', 'blank')
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        page_iter = iter(pages)
+        options = options or {}
+        batch_size = self._effective_batch_size(total)
+        results: Dict[int, Dict[str, Any]] = {}
+        pending = set()
+        exhausted = False
+        completed = 0
+        
+        async def run_batch(batch: List[Tuple[int, Any]]) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]]]:
+            batch_pages = [page for _, page in batch]
+            start_time, started = time.time(), time.perf_counter()
+            if len(batch_pages) == 1:
+                batch_results = [await loop.run_in_executor(executor, ocr_page, batch_pages[0], options)]
+            else:
+                batch_results = await loop.run_in_executor(executor, ocr_page_batch, batch_pages, options)
+                
+            trace = current_trace()
+            if trace is not None:
+                # Pages of a batch share one Tesseract run, and the time includes
+                # waiting for a free worker, so each page gets the batch's timing
+                duration = time.perf_counter() - started
+                for (page_number, _), result in zip(batch, batch_results):
+                    trace.add_span("ocr_page", start_time, duration, page=page_number,
+                                   batch_size=len(batch), blank=result["blank"])
+            return batch, batch_results
+            
+        try:
+            while True:
+                # Top up the in-flight window; pulling the next pages may rasterize
+                # a new window, so do it off the event loop
+                while not exhausted and len(pending) < self.max_in_flight:
+                    batch = await asyncio.to_thread(_take, page_iter, batch_size)
+                    if len(batch) < batch_size:
+                        exhausted = True
+                    if not batch:
+                        break
+                    pending.add(asyncio.ensure_future(run_batch(batch)))
+                    
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch, batch_results = task.result()
+                    for (page_number, page), result in zip(batch, batch_results):
+                        results[page_number] = result
+                        if page_callback:
+                            page_callback(page_number, result["text"])
+                        if release_page:
+                            release_page(page)
+                        completed += 1
+                        page_total = total or "?"
+                        status = "skipped as blank" if result["blank"] else "done"
+                        self.logger.info(f"OCR page {page_number}/{page_total} {status} ({completed}/{page_total})")
+                        if progress_callback:
+                            progress_callback(page_number, completed, total or 0)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool on the next call
+            self._executor = None
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+                
+        return results
+    
+    def shutdown(self):
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
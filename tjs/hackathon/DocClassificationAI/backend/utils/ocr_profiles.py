@@ -0,0 +1,129 @@
+import os
+import math
+import numpy as np
+from typing import Dict, Any, Optional
+from PIL import Image
+
+# Named OCR speed/accuracy tradeoffs. Every setting here changes OCR output,
+# so the whole profile is part of the OCR cache key.
+OCR_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {
+        "dpi": 150,                   # PDF rasterization resolution
+        "grayscale": True,            # Rasterize/convert to 8-bit grey
+        "draft": True,                # Let the JPEG decoder downscale while decoding
+        "max_pixels": 4_000_000,      # Downscale larger images (e.g. 12 MP phone photos)
+        "binarize": False,            # Otsu threshold to pure black and white
+        "tesseract_config": ""
+    },
+    "balanced": {
+        "dpi": 200,
+        "grayscale": False,
+        "draft": False,
+        "max_pixels": None,
+        "binarize": False,
+        "tesseract_config": ""
+    },
+    "accurate": {
+        "dpi": 300,
+        "grayscale": True,
+        "draft": False,
+        "max_pixels": None,
+        "binarize": True,
+        "tesseract_config": ""
+    }
+}
+
+
+def select_profile(requested: Optional[str] = None, file_size_mb: float = 0.0) -> str:
+    """
+    Choose the OCR profile for a document.
+
+    An explicitly requested profile wins; otherwise large files get the fast
+    profile and everything else the default (OCR_PROFILE, 'balanced' if unset).
+
+    Args:
+        requested: Profile name chosen by the caller, if any
+        file_size_mb: Size of the uploaded file
+
+    Returns:
+        Name of a profile in OCR_PROFILES
+    """
+    if requested:
+        if requested not in OCR_PROFILES:
+            raise ValueError(f"Unknown OCR profile: {requested}")
+        return requested
+
+    fast_min_mb = float(os.getenv("OCR_FAST_PROFILE_MIN_MB", "25"))
+    if fast_min_mb and file_size_mb >= fast_min_mb:
+        return "fast"
+
+    return os.getenv("OCR_PROFILE", "balanced")
+
+
+def needs_preprocessing(profile: Dict[str, Any]) -> bool:
+    """Whether page images must be transformed before being handed to Tesseract."""
+    return bool(profile.get("grayscale") or profile.get("draft")
+                or profile.get("max_pixels") or profile.get("binarize"))
+
+
+def preprocess_image(image: Image.Image, profile: Dict[str, Any]) -> Image.Image:
+    """
+    Apply a profile's image preprocessing before OCR.
+
+    Args:
+        image: Freshly opened (not yet loaded) page image
+        profile: Profile settings from OCR_PROFILES
+
+    Returns:
+        Preprocessed image
+    """
+    max_pixels = profile.get("max_pixels")
+    target_size = None
+    if max_pixels and image.width * image.height > max_pixels:
+        scale = math.sqrt(max_pixels / (image.width * image.height))
+        target_size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+
+    # JPEG draft mode decodes directly at a reduced scale and/or in greyscale,
+    # skipping most of the decode work for large photos
+    if profile.get("draft") and image.format == "JPEG":
+        image.draft("L" if profile.get("grayscale") else "RGB", target_size or image.size)
+
+    if profile.get("grayscale") and image.mode != "L":
+        image = image.convert("L")
+
+    if target_size and image.width * image.height > max_pixels:
+        image = image.resize(target_size, Image.BILINEAR)
+
+    if profile.get("binarize"):
+        image = binarize(image)
+
+    return image
+
+
+def binarize(image: Image.Image) -> Image.Image:
+    """
+    Threshold an image to black and white using Otsu's method.
+
+    Args:
+        image: Page image
+
+    Returns:
+        Binarized greyscale image
+    """
+    pixels = np.asarray(image.convert("L"), dtype=np.uint8)
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    total = pixels.size
+
+    # Between-class variance for every candidate threshold at once
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    cumulative_mean = np.cumsum(histogram * np.arange(256))
+    global_mean = cumulative_mean[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_background = cumulative_mean / weight_background
+        mean_foreground = (global_mean - cumulative_mean) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    # Uniform images have no valid split; nan_to_num makes them threshold at 0 (all white)
+    threshold = int(np.argmax(np.nan_to_num(variance)))
+
+    return Image.fromarray(np.where(pixels > threshold, 255, 0).astype(np.uint8))
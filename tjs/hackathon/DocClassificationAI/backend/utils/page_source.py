@@ -0,0 +1,196 @@
+import io
+import os
+import shutil
+import tempfile
+import logging
+from typing import Iterator, List, Optional, Tuple
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+from utils.tracing import span
+
+
+class PDFPageSource:
+    """
+    Streams a PDF as file-backed page images, rasterizing a window of pages at a time.
+
+    Only the current window is ever rasterized, and each page image lives on disk
+    until release() is called, so memory stays flat regardless of page count.
+    """
+
+    def __init__(self, pdf_path: str, window_size: int = 8, dpi: int = 200,
+                 work_dir: Optional[str] = None, page_numbers: Optional[List[int]] = None,
+                 grayscale: bool = False):
+        self.pdf_path = pdf_path
+        self.grayscale = grayscale
+        # Restrict rasterization to these pages (e.g. those without a usable text layer)
+        self.page_numbers = sorted(page_numbers) if page_numbers is not None else None
+        self.window_size = max(1, window_size)
+        self.dpi = dpi
+        self.work_dir = work_dir
+        self.logger = logging.getLogger("page_source")
+        self._temp_dir: Optional[str] = None
+        self._page_count: Optional[int] = None
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the PDF (read from pdfinfo, no rasterization)."""
+        if self._page_count is None:
+            self._page_count = int(pdfinfo_from_path(self.pdf_path)["Pages"])
+        return self._page_count
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, image_path) pairs in page order.
+
+        Returns:
+            Iterator of 1-based page numbers and paths to rasterized page images
+        """
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="ocr_pages_", dir=self.work_dir)
+
+        total = self.page_count
+        for first_page, last_page in self._windows():
+            self.logger.info(f"Rasterizing pages {first_page}-{last_page}/{total}")
+            
+            with span("rasterize", first_page=first_page, last_page=last_page, dpi=self.dpi):
+                page_paths = convert_from_path(
+                    self.pdf_path,
+                    dpi=self.dpi,
+                    grayscale=self.grayscale,
+                    first_page=first_page,
+                    last_page=last_page,
+                    output_folder=self._temp_dir,
+                    paths_only=True
+                )
+            
+            for offset, page_path in enumerate(page_paths):
+                yield first_page + offset, page_path
+    
+    def _windows(self) -> List[Tuple[int, int]]:
+        """Split the selected pages into contiguous (first_page, last_page) windows."""
+        page_numbers = self.page_numbers
+        if page_numbers is None:
+            page_numbers = list(range(1, self.page_count + 1))
+            
+        windows = []
+        start = previous = None
+        for page_number in page_numbers:
+            if start is not None and page_number == previous + 1 and page_number - start < self.window_size:
+                previous = page_number
+                continue
+            if start is not None:
+                windows.append((start, previous))
+            start = previous = page_number
+        if start is not None:
+            windows.append((start, previous))
+            
+        return windows
+    
+    def release(self, page_path: str):
+        """Delete a page image once its text has been captured."""
+        try:
+            os.remove(page_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Remove any remaining page images."""
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TIFFPageSource:
+    """
+    Streams a multi-frame TIFF (e.g. a multi-page fax) as file-backed page images.
+    
+    Frames are decoded one at a time and written to disk as they are pulled,
+    so only a single frame is held in memory regardless of frame count.
+    """
+    
+    # Modes PNG can store as-is; anything else (CMYK, 16-bit) is converted to RGB
+    _PNG_MODES = ("1", "L", "LA", "P", "RGB", "RGBA")
+    
+    def __init__(self, tiff_path: str, work_dir: Optional[str] = None):
+        self.tiff_path = tiff_path
+        self.work_dir = work_dir
+        self.logger = logging.getLogger("page_source")
+        self._temp_dir: Optional[str] = None
+        self._page_count: Optional[int] = None
+    
+    @property
+    def page_count(self) -> int:
+        """Number of frames in the TIFF (read from the file header, no decoding)."""
+        if self._page_count is None:
+            with Image.open(self.tiff_path) as image:
+                self._page_count = getattr(image, "n_frames", 1)
+        return self._page_count
+    
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, image_path) pairs in frame order.
+        
+        Returns:
+            Iterator of 1-based page numbers and paths to single-frame page images
+        """
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="ocr_frames_", dir=self.work_dir)
+            
+        with Image.open(self.tiff_path) as image:
+            total = getattr(image, "n_frames", 1)
+            for index in range(total):
+                page_path = os.path.join(self._temp_dir, f"frame_{index + 1:05d}.png")
+                with span("rasterize", first_page=index + 1, last_page=index + 1):
+                    image.seek(index)
+                    frame = image if image.mode in self._PNG_MODES else image.convert("RGB")
+                    frame.save(page_path)
+                self.logger.debug(f"Extracted TIFF frame {index + 1}/{total}")
+                yield index + 1, page_path
+    
+    def release(self, page_path: str):
+        """Delete a frame image once its text has been captured."""
+        try:
+            os.remove(page_path)
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        """Remove any remaining frame images."""
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def count_pages(file_path: str, file_bytes: Optional[bytes] = None) -> int:
+    """
+    Count the pages of a document without rasterizing it.
+    
+    Args:
+        file_path: Path to a PDF or image
+        file_bytes: Contents of an image held in memory instead of at file_path
+        
+    Returns:
+        Page count (frames for TIFFs, 1 for other images and unreadable files)
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    try:
+        if extension == ".pdf":
+            return max(1, int(pdfinfo_from_path(file_path)["Pages"]))
+        if extension in (".tiff", ".tif"):
+            with Image.open(io.BytesIO(file_bytes) if file_bytes is not None else file_path) as image:
+                return max(1, getattr(image, "n_frames", 1))
+    except Exception as e:
+        logging.getLogger("page_source").warning(f"Could not count pages of {file_path}: {str(e)}")
+    return 1
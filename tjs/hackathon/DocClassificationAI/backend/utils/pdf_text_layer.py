@@ -0,0 +1,73 @@
+import subprocess
+import logging
+from typing import Dict
+
+
+class PDFTextLayer:
+    """
+    Reads the embedded text layer of born-digital PDFs with poppler's pdftotext.
+    
+    pdftotext ships with poppler-utils alongside pdftoppm (used by pdf2image),
+    so no extra dependency is needed. Pages whose text layer is missing or too
+    poor to trust are left for Tesseract.
+    """
+    
+    def __init__(self, min_chars: int = 50, min_alnum_ratio: float = 0.6, timeout: int = 60):
+        self.min_chars = min_chars
+        self.min_alnum_ratio = min_alnum_ratio
+        self.timeout = timeout
+        self.logger = logging.getLogger("pdf_text_layer")
+    
+    def extract_pages(self, pdf_path: str) -> Dict[int, str]:
+        """
+        Extract usable embedded text per page.
+        
+        Args:
+            pdf_path: Path to the PDF
+            
+        Returns:
+            Dictionary mapping 1-based page numbers to text, only for pages
+            whose text layer passes the quality check
+        """
+        try:
+            result = subprocess.run(
+                ["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+                capture_output=True,
+                timeout=self.timeout
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+            self.logger.warning(f"pdftotext unavailable for {pdf_path}: {str(e)}")
+            return {}
+            
+        if result.returncode != 0:
+            self.logger.warning(f"pdftotext failed for {pdf_path}: {result.stderr.decode(errors='ignore').strip()}")
+            return {}
+            
+        # pdftotext ends every page with a form feed
+        raw_pages = result.stdout.decode("utf-8", errors="ignore").split("\f")
+        if raw_pages and not raw_pages[-1].strip():
+            raw_pages = raw_pages[:-1]
+            
+        usable_pages = {}
+        for page_number, text in enumerate(raw_pages, start=1):
+            if self.is_usable(text):
+                usable_pages[page_number] = text
+                
+        return usable_pages
+    
+    def is_usable(self, text: str) -> bool:
+        """
+        Decide whether a page's embedded text is good enough to skip OCR.
+        
+        Args:
+            text: Embedded text of one page
+            
+        Returns:
+            True if the text has enough characters and is mostly alphanumeric
+        """
+        visible = "".join(text.split())
+        if len(visible) < self.min_chars:
+            return False
+            
+        alnum_count = sum(1 for c in visible if c.isalnum())
+        return alnum_count / len(visible) >= self.min_alnum_ratio
@@ -0,0 +1,44 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+ProgressListener = Callable[[Dict[str, Any]], None]
+
+# Listener for progress of the document currently being processed. Like the
+# current trace, asyncio tasks and asyncio.to_thread calls inherit it, so
+# background OCR keeps reporting after its strand has returned.
+_current_listener: ContextVar[Optional[ProgressListener]] = ContextVar("current_progress_listener", default=None)
+
+logger = logging.getLogger("progress")
+
+
+@contextmanager
+def use_progress(listener: Optional[ProgressListener]) -> Iterator[Optional[ProgressListener]]:
+    """Send progress reported by the enclosed block (and tasks it starts) to listener."""
+    token = _current_listener.set(listener)
+    try:
+        yield listener
+    finally:
+        _current_listener.reset(token)
+
+
+def report_progress(stage: str, status: str, **details: Any):
+    """
+    Report progress of the current document; a no-op without a listener.
+    
+    Listener errors are logged and swallowed, so a client that went away
+    never fails the document.
+    
+    Args:
+        stage: Strand name, e.g. 'ocr'
+        status: 'started', 'running', 'in_progress', 'completed' or 'failed'
+        **details: Stage-specific fields, e.g. pages_done and page_count for OCR
+    """
+    listener = _current_listener.get()
+    if listener is None:
+        return
+    try:
+        listener({"stage": stage, "status": status, **details})
+    except Exception as e:
+        logger.warning(f"Progress listener failed: {str(e)}")
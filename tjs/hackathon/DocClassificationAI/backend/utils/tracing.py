@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import logging.handlers
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Trace and span of the code currently running. Asyncio tasks and
+# asyncio.to_thread calls inherit them, so nested helpers can record spans
+# without the trace being passed down explicitly.
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """
+    Timeline of the work done for one document.
+    
+    A trace is created when a document is received and carried through the
+    pipeline data as 'trace'. Spans record named, timed steps (saving the
+    upload, rasterizing pages, each page's OCR, the LLM request, ...) with
+    the span that was open when they started as their parent.
+    """
+    
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block of work as a span of this trace.
+        
+        Args:
+            name: Span name, e.g. 'rasterize'
+            **attributes: Details to record with the span
+            
+        Yields:
+            The span's attribute dictionary, for details known only at the end
+        """
+        span_id = uuid.uuid4().hex[:16]
+        parent_id = _current_span.get()
+        token = _current_span.set(span_id)
+        start_time = time.time()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield attributes
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self._append(name, span_id, parent_id, start_time, time.perf_counter() - started, attributes, error)
+    
+    def add_span(self, name: str, start_time: float, duration: float, **attributes: Any):
+        """
+        Record a span timed elsewhere (e.g. in a worker process).
+        
+        Args:
+            name: Span name
+            start_time: Wall-clock start, as time.time()
+            duration: Duration in seconds
+            **attributes: Details to record with the span
+        """
+        self._append(name, uuid.uuid4().hex[:16], _current_span.get(), start_time, duration, attributes, None)
+    
+    def _append(self, name: str, span_id: str, parent_id: Optional[str], start_time: float,
+                duration: float, attributes: Dict[str, Any], error: Optional[str]):
+        span = {
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "start_ms": round((start_time - self.start_time) * 1000, 1),
+            "duration_ms": round(duration * 1000, 1),
+            "attributes": attributes
+        }
+        if error:
+            span["error"] = error
+        with self._lock:
+            self.spans.append(span)
+    
+    def finish(self):
+        """Mark the end of the trace; later calls keep the first end time."""
+        if self.end_time is None:
+            self.end_time = time.time()
+    
+    @property
+    def duration_ms(self) -> float:
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return round((end_time - self.start_time) * 1000, 1)
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Condensed view of the trace: span count and total time per span name.
+        
+        Returns:
+            Dictionary with the trace ID, total duration and per-name span totals
+        """
+        with self._lock:
+            spans = list(self.spans)
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(spans, key=lambda s: s["start_ms"]):
+            total = totals.setdefault(span["name"], {"count": 0, "total_ms": 0.0, "errors": 0})
+            total["count"] += 1
+            total["total_ms"] = round(total["total_ms"] + span["duration_ms"], 1)
+            total["errors"] += 1 if "error" in span else 0
+        return {"trace_id": self.trace_id, "duration_ms": self.duration_ms, "spans": totals}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Full trace record, as written to the trace log."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "spans": spans
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the document being processed by the calling code, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def use_trace(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make trace the current trace for the enclosed block (and tasks it starts)."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block of work as a span of the current trace; a no-op without one.
+    
+    Args:
+        name: Span name
+        **attributes: Details to record with the span
+        
+    Yields:
+        The span's attribute dictionary
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield attributes
+        return
+    with trace.span(name, **attributes) as span_attributes:
+        yield span_attributes
+
+
+class TraceLog:
+    """
+    Appends finished traces to a local JSONL file, rotated by size.
+    """
+    
+    def __init__(self, path: Optional[str] = "logs/traces.jsonl", max_mb: float = 10.0, backups: int = 5):
+        self.logger = logging.getLogger("trace_log")
+        self.path = None
+        self._writer: Optional[logging.Logger] = None
+        if not path:
+            return
+            
+        # Resolve relative paths from the backend directory, like the other data paths
+        if not os.path.isabs(path):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            path = os.path.join(backend_dir, path)
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # The logging handler gives us thread-safe appends and size-based rotation;
+        # the file is only created once a trace is written
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=int(max_mb * 1024 * 1024), backupCount=backups, encoding="utf-8", delay=True
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._writer = logging.getLogger(f"trace_log.{path}")
+        self._writer.handlers = [handler]
+        self._writer.setLevel(logging.INFO)
+        self._writer.propagate = False
+    
+    def write(self, trace: Optional[Trace]):
+        """
+        Finish a trace and append it to the log.
+        
+        Args:
+            trace: Trace to write; None is ignored
+        """
+        if trace is None:
+            return
+        trace.finish()
+        if self._writer is None:
+            return
+        try:
+            self._writer.info(json.dumps(trace.to_dict(), default=str))
+        except Exception as e:
+            self.logger.warning(f"Could not write trace {trace.trace_id}: {str(e)}")
+
+
+def create_trace_log(suffix: Optional[str] = None) -> TraceLog:
+    """
+    Trace log configured from the environment (TRACE_LOG_PATH, empty to disable).
+    
+    Args:
+        suffix: Added to the file name so each process rotates its own file,
+            e.g. 'worker-0' for traces.worker-0.jsonl
+            
+    Returns:
+        Trace log
+    """
+    path = os.getenv("TRACE_LOG_PATH", "logs/traces.jsonl")
+    if path and suffix:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.{suffix}{ext}"
+    return TraceLog(
+        path,
+        max_mb=float(os.getenv("TRACE_LOG_MAX_MB", "10")),
+        backups=int(os.getenv("TRACE_LOG_BACKUPS", "5"))
+    )
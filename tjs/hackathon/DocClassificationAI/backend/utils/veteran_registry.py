@@ -0,0 +1,196 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+# Finds the registered veteran a name should be grouped with, or None
+Matcher = Callable[[str, Iterable[str]], Optional[str]]
+
+
+class VeteranRegistry:
+    """
+    Veteran names documents are filed under, shared by every process routing
+    into the same data directory.
+    
+    Backed by SQLite (WAL) on the data volume, so API workers, job workers and
+    ingestion daemons all group a veteran's documents into the same folder.
+    Each process keeps a hot copy of the names and tops it up with rows added
+    since its last read, at most every refresh_seconds. Names are never
+    removed once a document is filed under them, so a match found in the copy
+    stays valid; only a name with no match takes the write lock, re-checks the
+    latest rows and is registered in the same transaction.
+    
+    A new name is registered as pending until a document has been routed
+    under it (confirm); if that routing fails the name is released again, so
+    no later document is grouped under a veteran with no folder.
+    """
+    
+    def __init__(self, db_path: str = "data/veteran_registry.db", refresh_seconds: float = 2.0,
+                 pending_timeout_seconds: float = 3600.0):
+        # Resolve relative paths from the backend directory, like the other data paths
+        if not os.path.isabs(db_path):
+            backend_dir = os.path.dirname(os.path.dirname(__file__))
+            db_path = os.path.join(backend_dir, db_path)
+        self.db_path = db_path
+        # How stale the hot copy may get before a lookup reads new rows
+        self.refresh_seconds = refresh_seconds
+        self.logger = logging.getLogger("veteran_registry")
+        
+        self._names: Set[str] = set()
+        # Names known to have a routed document, so confirm() rarely needs to write
+        self._confirmed: Set[str] = set()
+        self._last_rowid = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS veterans (
+                    name TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    confirmed INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            # Registries created before names were confirmed only hold routed names
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(veterans)")}
+            if "confirmed" not in columns:
+                conn.execute("ALTER TABLE veterans ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1")
+            # Pending names left behind by a process that died while routing
+            stale = conn.execute("DELETE FROM veterans WHERE confirmed = 0 AND created_at < ?",
+                                 (time.time() - pending_timeout_seconds,)).rowcount
+            if stale:
+                self.logger.info(f"Dropped {stale} veteran names that were never routed")
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection; one per operation keeps the registry safe across threads and processes."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def _load_new(self, conn: sqlite3.Connection):
+        """Add rows registered since the last read to the hot copy."""
+        with self._lock:
+            last_rowid = self._last_rowid
+        rows = conn.execute("SELECT rowid, name, confirmed FROM veterans WHERE rowid > ? ORDER BY rowid",
+                            (last_rowid,)).fetchall()
+        with self._lock:
+            for row in rows:
+                self._names.add(row["name"])
+                if row["confirmed"]:
+                    self._confirmed.add(row["name"])
+                self._last_rowid = max(self._last_rowid, row["rowid"])
+            self._refreshed_at = time.monotonic()
+    
+    def names(self) -> Set[str]:
+        """
+        Registered veteran names, from the hot copy.
+        
+        Returns:
+            Snapshot of the names, at most refresh_seconds behind the database
+        """
+        with self._lock:
+            stale = time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        if stale:
+            with self._connect() as conn:
+                self._load_new(conn)
+        with self._lock:
+            return set(self._names)
+    
+    def add_many(self, names: Iterable[str]):
+        """
+        Register names that already have folders (e.g. found on disk at startup).
+        
+        Args:
+            names: Veteran names; ones already registered are ignored
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT INTO veterans (name, created_at, confirmed) VALUES (?, ?, 1) "
+                             "ON CONFLICT (name) DO UPDATE SET confirmed = 1",
+                             [(name, now) for name in names])
+            self._load_new(conn)
+    
+    def resolve(self, name: str, match: Matcher) -> Tuple[str, bool]:
+        """
+        Pick the veteran to file a document under, registering name (as pending) if it is new.
+        
+        Concurrent callers in any process get the same answer for names that
+        match each other: the check for an existing match and the registration
+        happen in one write transaction. Once the document is routed, call
+        confirm(); if routing fails and this call registered the name, call release().
+        
+        Args:
+            name: Sanitized veteran name found in the document
+            match: Returns the registered name to group name with, or None
+            
+        Returns:
+            The matching registered name (or name itself), and whether this call registered it
+        """
+        names = self.names()
+        if name in names:
+            return name, False
+        existing = match(name, names)
+        if existing:
+            return existing, False
+            
+        registered = False
+        with self._connect() as conn:
+            # IMMEDIATE takes the write lock up front, so two processes cannot both
+            # register different spellings of the same veteran
+            conn.execute("BEGIN IMMEDIATE")
+            self._load_new(conn)
+            with self._lock:
+                names = set(self._names)
+            existing = name if name in names else match(name, names)
+            if not existing:
+                conn.execute("INSERT INTO veterans (name, created_at, confirmed) VALUES (?, ?, 0)",
+                             (name, time.time()))
+                existing = name
+                registered = True
+            conn.execute("COMMIT")
+            
+        with self._lock:
+            self._names.add(existing)
+        return existing, registered
+    
+    def confirm(self, name: str):
+        """Mark a name as having a routed document, keeping it registered for good."""
+        with self._lock:
+            if name in self._confirmed:
+                return
+        with self._connect() as conn:
+            # Re-registers the name if a failed document released it in the meantime
+            conn.execute("INSERT INTO veterans (name, created_at, confirmed) VALUES (?, ?, 1) "
+                         "ON CONFLICT (name) DO UPDATE SET confirmed = 1", (name, time.time()))
+        with self._lock:
+            self._names.add(name)
+            self._confirmed.add(name)
+    
+    def release(self, name: str):
+        """Unregister a name registered by resolve() whose document could not be routed."""
+        with self._connect() as conn:
+            # A name confirmed by another document in the meantime stays
+            released = conn.execute("DELETE FROM veterans WHERE name = ? AND confirmed = 0", (name,)).rowcount
+        if released:
+            with self._lock:
+                self._names.discard(name)
+            self.logger.info(f"Released veteran name {name}; its document was not routed")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Number of registered veterans and where the registry lives."""
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM veterans").fetchone()[0]
+        return {"veterans": count, "db_path": self.db_path}
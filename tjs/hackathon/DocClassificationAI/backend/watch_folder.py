@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Watch-folder ingestion daemon for VA Document Classification System
+
+Watches a drop directory (e.g. the share scanners save into) and runs every
+new file through the strand pipeline, so nobody has to upload scans by hand.
+Files are routed out of the directory like uploads once processed:
+
+    python watch_folder.py /mnt/scans --concurrency 4
+
+New files are noticed through inotify (via watchfiles), or by rescanning the
+directory when that is unavailable or --poll is given (needed for network
+shares, whose remote writes raise no inotify events).
+"""
+
+import os
+import time
+import signal
+import asyncio
+import argparse
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from utils.file_ops import FileOperations
+from utils.ingest_manifest import IngestManifest
+from utils.metrics import WATCH_FILES, WATCH_FILES_PENDING, WATCH_LAG, start_http_server
+from utils.ocr_cache import OCRCache
+from utils.tracing import Trace, TraceLog
+
+try:
+    from watchfiles import Change, awatch
+except ImportError:
+    awatch = None
+
+
+class WatchFolder:
+    """
+    Feeds files dropped into a directory through the strand pipeline.
+    
+    A file is picked up once its size and modification time have stayed the
+    same for settle_seconds, so scans still being written are left alone.
+    Files whose content was already processed are recorded as duplicates and
+    left in place; copies of a file still in the pipeline wait for its outcome,
+    and one of them is processed instead if it fails. Every outcome goes into
+    a manifest that doubles as the checkpoint: after a restart, files already
+    done, duplicated or failed max_attempts times are skipped unless they
+    changed.
+    """
+    
+    def __init__(self, directory: str, manifest: IngestManifest, concurrency: int = 4,
+                 settle_seconds: float = 5.0, poll_seconds: float = 2.0, rescan_seconds: float = 300.0,
+                 force_polling: bool = False, max_attempts: int = 3, ocr_profile: Optional[str] = None,
+                 trace_log: Optional[TraceLog] = None):
+        self.directory = os.path.abspath(directory)
+        self.manifest = manifest
+        # Documents in the pipeline at once
+        self.concurrency = concurrency
+        # Seconds a file must stay unchanged before it counts as fully written
+        self.settle_seconds = settle_seconds
+        # Rescan interval when polling, and as a safety net for missed inotify events
+        self.poll_seconds = poll_seconds
+        self.rescan_seconds = rescan_seconds
+        self.use_events = awatch is not None and not force_polling
+        self.max_attempts = max_attempts
+        self.ocr_profile = ocr_profile
+        self.trace_log = trace_log
+        self.logger = logging.getLogger("watch_folder")
+        self.file_ops = FileOperations()
+        
+        # Candidate files: path -> (size, mtime, unchanged since)
+        self._settling: Dict[str, Tuple[int, float, float]] = {}
+        # Files handed on for processing: (path, size, mtime)
+        self._ready: asyncio.Queue = asyncio.Queue()
+        # Paths queued or in the pipeline, and the content hashes in the pipeline
+        self._active: Set[str] = set()
+        self._active_hashes: Dict[str, str] = {}
+        # Files held back until the in-flight file with the same content has an outcome
+        self._waiting: Dict[str, List[Tuple[str, int, float]]] = {}
+        self._processing = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._entries: Dict[str, Tuple[int, float, str, int]] = {}
+    
+    async def run(self):
+        """Watch and process until cancelled."""
+        self._entries = await asyncio.to_thread(self.manifest.entries)
+        self.logger.info(f"Watching {self.directory} "
+                         f"({'inotify' if self.use_events else f'polling every {self.poll_seconds}s'}, "
+                         f"{self.concurrency} documents at a time)")
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in
+                 (self._rescan(), self._settle(), self._process())]
+        if self.use_events:
+            tasks.append(asyncio.ensure_future(self._watch_events()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def _consider(self, path: str):
+        """Start watching a file for write completion unless it is known or unsupported."""
+        name = os.path.basename(path)
+        if (path in self._settling or path in self._active or name.startswith(".")
+                or not self.file_ops.validate_file_type(name)):
+            return
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime:
+            if entry[2] in ("done", "duplicate") or entry[3] >= self.max_attempts:
+                return
+        self._settling[path] = (stat.st_size, stat.st_mtime, time.monotonic())
+    
+    def _list_files(self):
+        paths = []
+        for directory, _, filenames in os.walk(self.directory):
+            paths.extend(os.path.join(directory, filename) for filename in filenames)
+        return paths
+    
+    async def _rescan(self):
+        while True:
+            for path in await asyncio.to_thread(self._list_files):
+                self._consider(path)
+            await asyncio.sleep(self.rescan_seconds if self.use_events else self.poll_seconds)
+    
+    async def _watch_events(self):
+        try:
+            async for changes in awatch(self.directory, recursive=True):
+                for change, path in changes:
+                    if change != Change.deleted:
+                        self._consider(path)
+        except Exception as e:
+            # e.g. inotify watch limit reached; keep going by rescanning
+            self.logger.warning(f"File events unavailable ({str(e)}); polling every {self.poll_seconds}s")
+            self.use_events = False
+    
+    async def _settle(self):
+        interval = min(1.0, self.settle_seconds / 2) or 0.5
+        while True:
+            now = time.monotonic()
+            for path, (size, mtime, since) in list(self._settling.items()):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    del self._settling[path]
+                    continue
+                if (stat.st_size, stat.st_mtime) != (size, mtime):
+                    self._settling[path] = (stat.st_size, stat.st_mtime, now)
+                elif now - since >= self.settle_seconds:
+                    del self._settling[path]
+                    self._active.add(path)
+                    self._ready.put_nowait((path, size, mtime))
+            self._update_gauges()
+            await asyncio.sleep(interval)
+    
+    def _update_gauges(self):
+        WATCH_FILES_PENDING.set(len(self._settling), state="settling")
+        WATCH_FILES_PENDING.set(self._ready.qsize(), state="queued")
+        WATCH_FILES_PENDING.set(self._processing, state="processing")
+    
+    async def _documents(self) -> AsyncIterator[Tuple[Tuple[str, int, float, str], Dict[str, Any]]]:
+        """Pipeline input for each settled file, holding back once concurrency documents are in flight."""
+        from main import pipeline_input
+        
+        while True:
+            path, size, mtime = await self._ready.get()
+            await self._slots.acquire()
+            try:
+                sha256 = await asyncio.to_thread(OCRCache.hash_file, path)
+                processed = await asyncio.to_thread(self.manifest.find_by_hash, sha256)
+                original = processed["path"] if processed else None
+            except FileNotFoundError:
+                # Removed before we got to it
+                self._finish(path)
+                continue
+            except Exception as e:
+                self.logger.error(f"Could not read {path}: {str(e)}")
+                await self._record(path, size, mtime, "failed", error=str(e))
+                self._finish(path)
+                continue
+                
+            if original:
+                self.logger.info(f"Skipping {path}: same content as {original}")
+                await self._record(path, size, mtime, "duplicate", sha256=sha256,
+                                   result={"duplicate_of": original})
+                self._finish(path)
+                continue
+                
+            if sha256 in self._active_hashes:
+                # Only a copy of a file that made it through counts as a duplicate
+                self.logger.info(f"Holding {path} until {self._active_hashes[sha256]} is processed")
+                self._waiting.setdefault(sha256, []).append((path, size, mtime))
+                self._slots.release()
+                continue
+                
+            self._active_hashes[sha256] = path
+            self._processing += 1
+            data = pipeline_input(path, os.path.basename(path), self.ocr_profile,
+                                  Trace("document", {"filename": os.path.basename(path), "source_path": path}))
+            data["file_sha256"] = sha256
+            yield (path, size, mtime, sha256), data
+    
+    async def _process(self):
+        from main import strand_pipeline, to_document_result
+        
+        async for (path, size, mtime, sha256), result in strand_pipeline.process_stream(self._documents()):
+            try:
+                if self.trace_log:
+                    await asyncio.to_thread(self.trace_log.write, result.get("trace"))
+                document_result = to_document_result(result)
+                status = "done" if document_result.status == "success" else "failed"
+                error = document_result.error or next(
+                    (str(result[key]) for key in result if key.endswith("_error") and result[key]), None)
+                await self._record(path, size, mtime, status, sha256=sha256, pages=result.get("page_count"),
+                                   result=document_result.model_dump(exclude={"trace"}), error=error)
+                WATCH_LAG.observe(max(0.0, time.time() - mtime))
+                self.logger.info(f"Processed {path}: {status}")
+            except Exception as e:
+                self.logger.error(f"Could not record result for {path}: {str(e)}")
+            finally:
+                self._processing -= 1
+                self._active_hashes.pop(sha256, None)
+                # Held copies are recorded as duplicates if this file is now done, else one is processed
+                for waiting in self._waiting.pop(sha256, []):
+                    self._ready.put_nowait(waiting)
+                self._finish(path)
+    
+    async def _record(self, path: str, size: int, mtime: float, status: str, **details: Any):
+        await asyncio.to_thread(self.manifest.record, path, size, mtime, status, **details)
+        attempts = self._entries.get(path, (0, 0.0, "", 0))[3]
+        self._entries[path] = (size, mtime, status, attempts + 1)
+        WATCH_FILES.inc(outcome=status)
+    
+    def _finish(self, path: str):
+        self._active.discard(path)
+        self._slots.release()
+        self._update_gauges()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process files dropped into a directory")
+    parser.add_argument("directory", nargs="?", default=os.getenv("WATCH_DIR"),
+                        help="Directory to watch (default: WATCH_DIR)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WATCH_CONCURRENCY", "4")),
+                        help="Documents processed at once")
+    parser.add_argument("--settle-seconds", type=float, default=float(os.getenv("WATCH_SETTLE_SECONDS", "5")),
+                        help="Seconds a file must stay unchanged before it is processed")
+    parser.add_argument("--poll", action="store_true",
+                        default=os.getenv("WATCH_FORCE_POLLING", "false").lower() == "true",
+                        help="Rescan the directory instead of using inotify (e.g. for network shares)")
+    parser.add_argument("--poll-seconds", type=float, default=float(os.getenv("WATCH_POLL_SECONDS", "2")),
+                        help="Rescan interval when polling")
+    parser.add_argument("--rescan-seconds", type=float, default=float(os.getenv("WATCH_RESCAN_SECONDS", "300")),
+                        help="Full rescan interval with inotify, to catch missed events")
+    parser.add_argument("--max-attempts", type=int, default=int(os.getenv("WATCH_MAX_ATTEMPTS", "3")),
+                        help="Failed files are retried until they have failed this often")
+    parser.add_argument("--manifest", default=os.getenv("WATCH_MANIFEST_PATH", "data/watch_manifest.db"),
+                        help="SQLite manifest / checkpoint of processed files")
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("WATCH_METRICS_PORT", "9108")),
+                        help="Port serving /metrics (0 disables)")
+    parser.add_argument("--ocr-profile", default=None, help="OCR profile for every file (fast, balanced, accurate)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if not args.directory or not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+        
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+        print(f"📈 Metrics at http://localhost:{args.metrics_port}/metrics")
+    
+    async def serve():
+        from main import ocr_strand
+        from utils.tracing import create_trace_log
+        
+        watcher = WatchFolder(
+            args.directory, IngestManifest(args.manifest), concurrency=max(1, args.concurrency),
+            settle_seconds=args.settle_seconds, poll_seconds=args.poll_seconds,
+            rescan_seconds=args.rescan_seconds, force_polling=args.poll, max_attempts=args.max_attempts,
+            ocr_profile=args.ocr_profile, trace_log=create_trace_log("watch")
+        )
+        task = asyncio.ensure_future(watcher.run())
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            ocr_strand.shutdown()
+            
+    print(f"👀 Watching {args.directory}; press Ctrl+C to stop")
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
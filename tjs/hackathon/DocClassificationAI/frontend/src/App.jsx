@@ -15,6 +15,7 @@ function App() {
   const [isUploading, setIsUploading] = useState(false)
   const [results, setResults] = useState(null)
   const [error, setError] = useState(null)
+  const [progress, setProgress] = useState({})
   const fileInputRef = useRef(null)
 
   const API_BASE_URL = 'http://localhost:8000'
@@ -45,6 +46,7 @@ function App() {
     setIsUploading(true)
     setError(null)
     setResults(null)
+    setProgress({})
 
     const formData = new FormData()
     files.forEach(file => {
@@ -52,7 +54,8 @@ function App() {
     })
 
     try {
-      const response = await fetch(`${API_BASE_URL}/upload-docs`, {
+      // Results arrive one file at a time as newline-delimited JSON events
+      const response = await fetch(`${API_BASE_URL}/upload-docs/stream`, {
         method: 'POST',
         body: formData,
       })
@@ -61,8 +64,53 @@ function App() {
         throw new Error(`HTTP error! status: ${response.status}`)
       }
 
-      const data = await response.json()
-      setResults(data)
+      const processedFiles = []
+      setResults({
+        total_files: files.length,
+        successful_files: 0,
+        failed_files: 0,
+        processed_files: [],
+        veteran_summary: null
+      })
+
+      const handleEvent = (event) => {
+        if (event.event === 'progress') {
+          setProgress(prev => ({ ...prev, [event.index]: describeProgress(event) }))
+        } else if (event.event === 'result') {
+          // Keep upload order while files finish in any order
+          processedFiles[event.index] = event.result
+          const finished = processedFiles.filter(Boolean)
+          const successful = finished.filter(file => file.status === 'success').length
+          setProgress(prev => ({ ...prev, [event.index]: event.result.status === 'success' ? 'Done' : 'Failed' }))
+          setResults(prev => ({
+            ...prev,
+            processed_files: finished,
+            successful_files: successful,
+            failed_files: finished.length - successful
+          }))
+        } else if (event.event === 'done') {
+          setResults(prev => ({
+            ...prev,
+            successful_files: event.successful_files,
+            failed_files: event.failed_files,
+            veteran_summary: event.veteran_summary
+          }))
+        } else if (event.event === 'error') {
+          setError(event.error)
+        }
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)))
+      }
     } catch (err) {
       setError(err.message || 'Failed to upload files')
     } finally {
@@ -70,6 +118,16 @@ function App() {
     }
   }
 
+  const describeProgress = (event) => {
+    const stage = event.stage.replace('_', ' ')
+    if (event.stage === 'ocr' && event.status === 'running') {
+      return `OCR page ${event.pages_done}/${event.page_count}`
+    }
+    if (event.status === 'started' || event.status === 'in_progress') return `Running ${stage}...`
+    if (event.status === 'failed') return `${stage} failed`
+    return `${stage} done`
+  }
+
   const removeFile = (index) => {
     setFiles(files.filter((_, i) => i !== index))
   }
@@ -145,7 +203,7 @@ function App() {
               ref={fileInputRef}
               type="file"
               multiple
-              accept=".pdf,.png,.jpg,.jpeg,.tiff,.bmp"
+              accept=".pdf,.png,.jpg,.jpeg,.tiff,.tif,.bmp"
               onChange={handleFileSelect}
               className="hidden"
             />
@@ -166,6 +224,11 @@ function App() {
                       <span className="text-xs text-gray-500 ml-2">
                         ({(file.size / 1024 / 1024).toFixed(2)} MB)
                       </span>
+                      {progress[index] && (
+                        <span className="text-xs text-primary-600 ml-3 capitalize">
+                          {progress[index]}
+                        </span>
+                      )}
                     </div>
                     <button
                       onClick={() => removeFile(index)}